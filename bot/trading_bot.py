@@ -4,37 +4,73 @@ Main autonomous trading system integrating all components
 """
 
 import asyncio
+import concurrent.futures
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Optional
 import numpy as np
-import json
+import orjson
 
 from data_collector.websocket_streamer import BinanceWebSocketStreamer
 from features.feature_engineer import FeatureEngineer
 from models.ensemble import EnsembleModel
 from rl.rl_agent import RLAgent
 from execution.order_executor import OrderExecutor
+from execution.position import Position
 from risk.risk_manager import RiskManager
 from monitoring.telegram_bot import TelegramNotifier
 from database.trade_logger import TradeLogger
 
+# Market features in the RL state: (feature name, default, scale)
+RL_MARKET_FEATURES = (
+    ('return_20', 0, 1),
+    ('natr', 0.02, 1),
+    ('rsi_14', 50, 0.01),
+    ('oi_price_divergence_20', 0, 1),
+    ('oi_change_20', 0, 1),
+    ('funding_rate', 0, 100),
+    ('volume_ratio', 1, 1),
+    ('bb_position', 0.5, 1)
+)
+RL_FEATURE_KEYS = tuple(key for key, _, _ in RL_MARKET_FEATURES)
+RL_FEATURE_DEFAULTS = np.array([default for _, default, _ in RL_MARKET_FEATURES], dtype=np.float32)
+RL_FEATURE_SCALES = np.array([scale for _, _, scale in RL_MARKET_FEATURES], dtype=np.float32)
+RL_STATE_SIZE = 20
+ACCOUNT_CACHE_TTL = 1.0  # seconds
+PREDICTION_CACHE_PREFIX = b"pred:"
+
+
+def _liquidation_distance(entry_price: float, current_price: float, leverage: float, direction: int) -> float:
+    """Relative distance from current price to the approximate liquidation price, clipped to [0, 1]"""
+    if current_price <= 0:
+        return 0.0
+
+    if direction == 1:  # Long
+        distance = (current_price - entry_price * (1 - 0.9 / leverage)) / current_price
+    else:  # Short
+        distance = (entry_price * (1 + 0.9 / leverage) - current_price) / current_price
+
+    return max(0.0, min(1.0, distance))
+
 
 class AITradingBot:
     """
     Main autonomous trading bot integrating all components
     """
 
-    def __init__(self, config: Dict, redis_client):
+    def __init__(self, config: Dict, redis_client, async_redis_client=None):
         """
         Initialize AI Trading Bot
 
         Args:
             config: Configuration dictionary
             redis_client: Redis client instance
+            async_redis_client: Optional redis.asyncio client for reads inside the trading loop
         """
         self.config = config
         self.redis = redis_client
+        self.async_redis = async_redis_client
         self.logger = logging.getLogger(__name__)
 
         # State
@@ -43,6 +79,8 @@ class AITradingBot:
         self.daily_pnl = 0
         self.trades_today = 0
         self.latest_data = {}
+        self._state_buf = np.zeros(RL_STATE_SIZE, dtype=np.float32)
+        self._account_cache = (0.0, None)  # (monotonic timestamp, account info)
 
         # Initialize components
         self.logger.info("Initializing AI Trading Bot components...")
@@ -58,6 +96,10 @@ class AITradingBot:
         # WebSocket streamer (will be started later)
         self.websocket_streamer = None
 
+        # Worker threads for blocking model inference
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='inference')
+        self._warmup_models()
+
         self.logger.info("AI Trading Bot initialized successfully")
 
     def _load_ml_models(self):
@@ -74,12 +116,30 @@ class AITradingBot:
         """Load trained RL agent"""
         self.logger.info("Loading RL agent...")
         try:
-            agent = RLAgent.load(self.config['models']['rl_agent_path'])
+            agent = RLAgent.load(
+                self.config['models']['rl_agent_path'],
+                quantize=self.config['models'].get('rl_quantize_int8', False)
+            )
             return agent
         except Exception as e:
             self.logger.error(f"Error loading RL agent: {e}", exc_info=True)
             return RLAgent()  # Return dummy agent
 
+    def _warmup_models(self):
+        """
+        Run one throwaway prediction through each model on the inference pool
+
+        The first call pays for lazy setup (torch kernels, XGBoost predictor
+        buffers, thread-local state in the pool workers); doing it here keeps
+        that stall out of the first live tick.
+        """
+        try:
+            features = dict.fromkeys(self.ml_model.feature_names, 0.0)
+            self._pool.submit(self.ml_model.predict, features).result()
+            self._pool.submit(self.rl_agent.predict, np.zeros(RL_STATE_SIZE, dtype=np.float32)).result()
+        except Exception as e:
+            self.logger.warning(f"Model warm-up failed: {e}")
+
     async def start(self):
         """Start the trading bot"""
         self.logger.info("=" * 60)
@@ -102,6 +162,7 @@ class AITradingBot:
         self.websocket_streamer = BinanceWebSocketStreamer(
             symbols=[self.config['symbol']],
             redis_client=self.redis,
+            async_redis_client=self.async_redis,
             api_key=self.config['binance'].get('api_key'),
             api_secret=self.config['binance'].get('api_secret')
         )
@@ -142,12 +203,14 @@ class AITradingBot:
                     await asyncio.sleep(5)
                     continue
 
-                # 3. Get ML predictions
-                ml_prediction = self.ml_model.predict(features)
+                # 3. Get ML predictions (off the event loop so streaming continues)
+                loop = asyncio.get_running_loop()
+                ml_prediction = await loop.run_in_executor(self._pool, self._predict_ml, features)
 
-                # 4. Get RL agent decision
+                # 4. Get RL agent decision (account fetched off the loop, then read from cache)
+                await self._cached_account_async()
                 state = self._construct_rl_state(features, ml_prediction)
-                action = self.rl_agent.predict(state)
+                action = await loop.run_in_executor(self._pool, self.rl_agent.predict, state)
 
                 # 5. Risk checks
                 if not self.risk_manager.can_trade():
@@ -161,14 +224,30 @@ class AITradingBot:
                 # 7. Update monitoring
                 await self._update_monitoring()
 
-                # Wait before next iteration
-                await asyncio.sleep(self.config['check_interval'])
+                # Wait for the next closed candle (check_interval is the fallback)
+                await self._wait_for_market_data()
 
             except Exception as e:
                 self.logger.error(f"Error in trading loop: {e}", exc_info=True)
                 await self.notifier.send_error(f"Trading loop error: {str(e)}")
                 await asyncio.sleep(10)
 
+    async def _wait_for_market_data(self):
+        """
+        Wait until the streamer reports a closed candle, or check_interval elapses
+        """
+        timeout = self.config['check_interval']
+        if self.websocket_streamer is None:
+            await asyncio.sleep(timeout)
+            return
+
+        event = self.websocket_streamer.kline_closed
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.debug(f"No candle close within {timeout}s, running loop anyway")
+        event.clear()
+
     async def _get_latest_market_data(self) -> Optional[Dict]:
         """
         Get latest market data from WebSocket or API
@@ -176,21 +255,25 @@ class AITradingBot:
         try:
             symbol = self.config['symbol']
 
-            # Get latest kline data
-            kline_data = self.websocket_streamer.get_latest_kline(symbol) if self.websocket_streamer else None
-
-            # Get latest funding data
-            funding_data = self.websocket_streamer.get_latest_funding(symbol) if self.websocket_streamer else None
-
             # Get OI data (would fetch from API)
-            oi_data = await self.order_executor.fetch_open_interest_hist(
+            oi_request = self.order_executor.fetch_open_interest_hist(
                 symbol=symbol,
                 period='5m',
                 limit=1
             )
 
+            # Get latest kline and funding data concurrently with the OI request
+            if self.websocket_streamer:
+                (kline_data, funding_data), oi_data = await asyncio.gather(
+                    self.websocket_streamer.get_latest_snapshot_async(symbol),
+                    oi_request
+                )
+            else:
+                kline_data, funding_data = None, None
+                oi_data = await oi_request
+
             if kline_data:
-                oi_value = oi_data.iloc[-1]['sum_open_interest'] if len(oi_data) > 0 else 0
+                oi_value = oi_data['sum_open_interest'].iat[-1] if len(oi_data) > 0 else 0
 
                 return {
                     'price': kline_data,
@@ -205,57 +288,112 @@ class AITradingBot:
             self.logger.error(f"Error getting market data: {e}")
             return None
 
+    def _predict_ml(self, features: Dict) -> Dict:
+        """
+        Get the ML prediction, reusing a cached result for unchanged features
+
+        Features move little within a candle, so predictions are cached in
+        Redis under a digest of the loaded model and the rounded feature
+        vector for models.prediction_cache_ttl seconds (0 disables the cache).
+        Dummy models return random draws, so their output is never cached.
+        """
+        ttl = self.config['models'].get('prediction_cache_ttl', 60)
+        if not ttl or not self.ml_model.has_model:
+            return self.ml_model.predict(features)
+
+        key = None
+        try:
+            key = PREDICTION_CACHE_PREFIX + self.ml_model.feature_key(features)
+            cached = self.redis.get(key)
+            if cached is not None:
+                prediction = orjson.loads(cached)
+                prediction['timestamp'] = features.get('timestamp', '')
+                return prediction
+        except Exception as e:
+            self.logger.warning(f"Prediction cache read failed: {e}")
+
+        prediction = self.ml_model.predict(features)
+
+        if key is not None:
+            try:
+                self.redis.setex(key, ttl, orjson.dumps(prediction, default=str))
+            except Exception as e:
+                self.logger.warning(f"Prediction cache write failed: {e}")
+
+        return prediction
+
     def _construct_rl_state(self, features: Dict, ml_prediction: Dict) -> np.ndarray:
         """
         Construct state vector for RL agent
+
+        The vector is written into a preallocated buffer that is reused on
+        every call, so callers must not hold on to it across iterations.
         """
         # Position status
-        position = self.current_position['direction'] if self.current_position else 0
-        position_pnl = self.current_position['unrealized_pnl'] if self.current_position else 0
-        time_in_position = self.current_position['duration'] if self.current_position else 0
-
-        # ML predictions
-        ml_signal = ml_prediction['signal'] - 1  # Convert to -1, 0, 1
-        ml_confidence = ml_prediction['confidence']
-        ml_target = ml_prediction['target']
-
-        # Market conditions
-        market_features = [
-            features.get('return_20', 0),
-            features.get('natr', 0.02),
-            features.get('rsi_14', 50) / 100,
-            features.get('oi_price_divergence_20', 0),
-            features.get('oi_change_20', 0),
-            features.get('funding_rate', 0) * 100,
-            features.get('volume_ratio', 1),
-            features.get('bb_position', 0.5)
-        ]
+        position = self.current_position.direction if self.current_position else 0
+        position_pnl = self.current_position.unrealized_pnl if self.current_position else 0
+        time_in_position = self.current_position.duration if self.current_position else 0
 
         # Account status
-        account = self.order_executor.get_account_info()
+        account = self._cached_account()
         equity = account['total_balance']
         equity_ratio = equity / self.config['initial_balance'] if self.config['initial_balance'] > 0 else 1
         balance_ratio = account['available_balance'] / equity if equity > 0 else 1
 
-        # Construct state
-        state = np.array([
-            position,
-            position_pnl / equity if equity > 0 else 0,
-            min(time_in_position / 100, 1.0),
-            ml_signal,
-            ml_confidence,
-            ml_target,
-            *market_features,
-            equity_ratio,
-            self.risk_manager.current_drawdown,
-            balance_ratio,
-            self.risk_manager.get_recent_sharpe(),
-            self._calculate_liquidation_distance(),
-            self.trades_today / 20  # Normalize
-        ], dtype=np.float32)
+        state = self._state_buf
+
+        # Position
+        state[0] = position
+        state[1] = position_pnl / equity if equity > 0 else 0
+        state[2] = min(time_in_position / 100, 1.0)
+
+        # ML predictions
+        state[3] = ml_prediction['signal'] - 1  # Convert to -1, 0, 1
+        state[4] = ml_prediction['confidence']
+        state[5] = ml_prediction['target']
+
+        # Market conditions
+        market = state[6:14]
+        market[:] = RL_FEATURE_DEFAULTS
+        for i, key in enumerate(RL_FEATURE_KEYS):
+            value = features.get(key)
+            if value is not None:
+                market[i] = value
+        market *= RL_FEATURE_SCALES
+
+        # Account and risk
+        state[14] = equity_ratio
+        state[15] = self.risk_manager.current_drawdown
+        state[16] = balance_ratio
+        state[17] = self.risk_manager.get_recent_sharpe()
+        state[18] = self._calculate_liquidation_distance()
+        state[19] = self.trades_today / 20  # Normalize
 
         return state
 
+    def _cached_account(self, ttl: float = ACCOUNT_CACHE_TTL) -> Dict:
+        """
+        Get account info, reusing the last snapshot for up to ttl seconds
+
+        Saves a REST round-trip for each of the several reads made within
+        one loop iteration. The cache is cleared after every order.
+        """
+        now = time.monotonic()
+        timestamp, account = self._account_cache
+        if account is None or now - timestamp > ttl:
+            account = self.order_executor.get_account_info()
+            self._account_cache = (now, account)
+        return account
+
+    async def _cached_account_async(self, ttl: float = ACCOUNT_CACHE_TTL) -> Dict:
+        """_cached_account that fetches in a worker thread when the snapshot is stale"""
+        now = time.monotonic()
+        timestamp, account = self._account_cache
+        if account is None or now - timestamp > ttl:
+            account = await self.order_executor.get_account_info_async()
+            self._account_cache = (time.monotonic(), account)
+        return account
+
     async def _execute_action(self, action: int, market_data: Dict, ml_prediction: Dict):
         """
         Execute RL agent's action
@@ -295,7 +433,7 @@ class AITradingBot:
         Open new position
         """
         # Calculate position size
-        account = self.order_executor.get_account_info()
+        account = await self._cached_account_async()
         equity = account['total_balance']
 
         # Risk 2% per trade
@@ -321,17 +459,15 @@ class AITradingBot:
             self.logger.info(f"[PAPER TRADING] Would open {side} position: {position_size:.4f} @ ${price:.2f}")
 
             # Simulate position
-            self.current_position = {
-                'direction': 1 if side == 'LONG' else -1,
-                'entry_price': price,
-                'size': position_size,
-                'entry_time': datetime.now(),
-                'duration': 0,
-                'unrealized_pnl': 0,
-                'stop_loss': price - (stop_distance if side == 'LONG' else -stop_distance),
-                'take_profit': price + (ml_prediction['target'] * price),
-                'ml_confidence': ml_prediction['confidence']
-            }
+            self.current_position = Position(
+                direction=1 if side == 'LONG' else -1,
+                entry_price=price,
+                size=position_size,
+                entry_time=datetime.now(),
+                stop_loss=price - (stop_distance if side == 'LONG' else -stop_distance),
+                take_profit=price + (ml_prediction['target'] * price),
+                ml_confidence=ml_prediction['confidence']
+            )
 
             self.trades_today += 1
             self.trade_logger.log_entry(self.current_position)
@@ -340,8 +476,8 @@ class AITradingBot:
                 f"[PAPER] OPENED {side} POSITION\n"
                 f"Entry: ${price:.2f}\n"
                 f"Size: {position_size:.4f}\n"
-                f"SL: ${self.current_position['stop_loss']:.2f}\n"
-                f"TP: ${self.current_position['take_profit']:.2f}\n"
+                f"SL: ${self.current_position.stop_loss:.2f}\n"
+                f"TP: ${self.current_position.take_profit:.2f}\n"
                 f"ML Confidence: {ml_prediction['confidence']:.2%}"
             )
 
@@ -353,19 +489,18 @@ class AITradingBot:
             side=side,
             quantity=position_size
         )
+        self._account_cache = (0.0, None)
 
         if order['status'] == 'FILLED':
-            self.current_position = {
-                'direction': 1 if side == 'LONG' else -1,
-                'entry_price': order['average_price'],
-                'size': position_size,
-                'entry_time': datetime.now(),
-                'duration': 0,
-                'unrealized_pnl': 0,
-                'stop_loss': price - (stop_distance if side == 'LONG' else -stop_distance),
-                'take_profit': price + (ml_prediction['target'] * price),
-                'ml_confidence': ml_prediction['confidence']
-            }
+            self.current_position = Position(
+                direction=1 if side == 'LONG' else -1,
+                entry_price=order['average_price'],
+                size=position_size,
+                entry_time=datetime.now(),
+                stop_loss=price - (stop_distance if side == 'LONG' else -stop_distance),
+                take_profit=price + (ml_prediction['target'] * price),
+                ml_confidence=ml_prediction['confidence']
+            )
 
             self.trades_today += 1
             self.trade_logger.log_entry(self.current_position)
@@ -374,8 +509,8 @@ class AITradingBot:
                 f"OPENED {side} POSITION\n"
                 f"Entry: ${price:.2f}\n"
                 f"Size: {position_size:.4f}\n"
-                f"SL: ${self.current_position['stop_loss']:.2f}\n"
-                f"TP: ${self.current_position['take_profit']:.2f}\n"
+                f"SL: ${self.current_position.stop_loss:.2f}\n"
+                f"TP: ${self.current_position.take_profit:.2f}\n"
                 f"ML Confidence: {ml_prediction['confidence']:.2%}"
             )
 
@@ -386,14 +521,13 @@ class AITradingBot:
         if self.current_position is None:
             return
 
-        side = 'SELL' if self.current_position['direction'] == 1 else 'BUY'
+        side = 'SELL' if self.current_position.direction == 1 else 'BUY'
 
         # Check if paper trading mode
         if self.config['safety'].get('paper_trading_mode', True):
             # Calculate PnL
             exit_price = price
-            pnl = (exit_price - self.current_position['entry_price']) * \
-                  self.current_position['size'] * self.current_position['direction']
+            pnl = self.current_position.pnl(exit_price)
 
             self.daily_pnl += pnl
 
@@ -405,10 +539,10 @@ class AITradingBot:
             pnl_emoji = "✅" if pnl > 0 else "❌"
             await self.notifier.send_trade_alert(
                 f"{pnl_emoji} [PAPER] CLOSED POSITION\n"
-                f"Entry: ${self.current_position['entry_price']:.2f}\n"
+                f"Entry: ${self.current_position.entry_price:.2f}\n"
                 f"Exit: ${exit_price:.2f}\n"
-                f"PnL: ${pnl:.2f} ({pnl/self.current_position['entry_price']*100:.2f}%)\n"
-                f"Duration: {self.current_position['duration']} periods"
+                f"PnL: ${pnl:.2f} ({pnl/self.current_position.entry_price*100:.2f}%)\n"
+                f"Duration: {self.current_position.duration} periods"
             )
 
             self.current_position = None
@@ -418,13 +552,13 @@ class AITradingBot:
         order = await self.order_executor.place_market_order(
             symbol=self.config['symbol'],
             side=side,
-            quantity=self.current_position['size']
+            quantity=self.current_position.size
         )
+        self._account_cache = (0.0, None)
 
         if order['status'] == 'FILLED':
             exit_price = order['average_price']
-            pnl = (exit_price - self.current_position['entry_price']) * \
-                  self.current_position['size'] * self.current_position['direction']
+            pnl = self.current_position.pnl(exit_price)
 
             self.daily_pnl += pnl
             self.trade_logger.log_exit(self.current_position, exit_price, pnl)
@@ -433,10 +567,10 @@ class AITradingBot:
             pnl_emoji = "✅" if pnl > 0 else "❌"
             await self.notifier.send_trade_alert(
                 f"{pnl_emoji} CLOSED POSITION\n"
-                f"Entry: ${self.current_position['entry_price']:.2f}\n"
+                f"Entry: ${self.current_position.entry_price:.2f}\n"
                 f"Exit: ${exit_price:.2f}\n"
                 f"PnL: ${pnl:.2f}\n"
-                f"Duration: {self.current_position['duration']} periods"
+                f"Duration: {self.current_position.duration} periods"
             )
 
             self.current_position = None
@@ -448,19 +582,14 @@ class AITradingBot:
         if self.current_position is None:
             return 1.0
 
-        current_price = float(self.latest_data.get('close', self.current_position['entry_price']))
-        leverage = self.config['leverage']
-        direction = self.current_position['direction']
-        entry_price = self.current_position['entry_price']
-
-        if direction == 1:  # Long
-            liq_price = entry_price * (1 - 0.9 / leverage)
-            distance = (current_price - liq_price) / current_price if current_price > 0 else 0
-        else:  # Short
-            liq_price = entry_price * (1 + 0.9 / leverage)
-            distance = (liq_price - current_price) / current_price if current_price > 0 else 0
+        current_price = float(self.latest_data.get('close', self.current_position.entry_price))
 
-        return max(0, min(1, distance))
+        return _liquidation_distance(
+            self.current_position.entry_price,
+            current_price,
+            self.config['leverage'],
+            self.current_position.direction
+        )
 
     async def _update_monitoring(self):
         """
@@ -472,15 +601,10 @@ class AITradingBot:
             current_price = float(current_price_data.get('close', 0))
 
             if current_price > 0:
-                self.current_position['unrealized_pnl'] = (
-                    (current_price - self.current_position['entry_price']) *
-                    self.current_position['size'] *
-                    self.current_position['direction']
-                )
-                self.current_position['duration'] += 1
+                self.current_position.mark(current_price)
 
         # Update risk manager
-        account = self.order_executor.get_account_info()
+        account = await self._cached_account_async()
         self.risk_manager.update(
             equity=account['total_balance'],
             daily_pnl=self.daily_pnl,
@@ -508,13 +632,17 @@ class AITradingBot:
         if self.websocket_streamer:
             self.websocket_streamer.stop()
 
+        self._pool.shutdown(wait=False)
+        self.trade_logger.close()
+
         # Send shutdown notification
-        account = self.order_executor.get_account_info()
+        account = await self.order_executor.get_account_info_async()
         await self.notifier.send_message(
             f"AI Trading Bot Stopped\n"
             f"Final Equity: ${account['total_balance']:.2f}\n"
             f"Daily PnL: ${self.daily_pnl:.2f}\n"
             f"Trades Today: {self.trades_today}"
         )
+        await self.notifier.close()
 
         self.logger.info("Trading bot stopped")
@@ -3,14 +3,42 @@ Real-time WebSocket data streamer for Binance Futures
 Streams klines, mark price, and other real-time data to Redis
 """
 
-import json
 import asyncio
 import logging
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple
+import orjson
 import websockets
-from binance.client import Client
-from binance.streams import ThreadedWebsocketManager
+
+# Binance Futures combined-stream endpoint (one connection for all streams)
+FUTURES_STREAM_URL = "wss://fstream.binance.com/stream?streams="
+RECONNECT_DELAY = 5  # seconds
+TRADE_FLUSH_INTERVAL = 0.1  # seconds between writes of the latest trade
+
+# Kline and mark snapshots are stored per symbol in a single hash ("ticker:SYMBOL")
+TICKER_TTL = 3600  # seconds
+
+# The latest trade is kept under its own short-lived key ("latest_trade:SYMBOL"),
+# so a stalled trade stream stops serving a price rather than leaving it in the
+# ticker hash for TICKER_TTL
+TRADE_TTL = 60  # seconds
+
+# Field order of the kline row stored in Redis
+KLINE_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'is_closed')
+
+
+def _decode_kline(raw) -> Dict:
+    """Rebuild the kline dict from its stored row"""
+    return dict(zip(KLINE_FIELDS, orjson.loads(raw)))
+
+
+def _ticker_key(symbol: str) -> bytes:
+    """Redis key of the snapshot hash for a symbol"""
+    return f"ticker:{symbol}".encode()
+
+
+def _trade_key(symbol: str) -> bytes:
+    """Redis key of the latest trade for a symbol"""
+    return f"latest_trade:{symbol}".encode()
 
 
 class BinanceWebSocketStreamer:
@@ -18,80 +46,103 @@ class BinanceWebSocketStreamer:
     WebSocket streamer for real-time Binance Futures data
     """
 
-    def __init__(self, symbols: List[str], redis_client, api_key: str = None, api_secret: str = None):
+    def __init__(self, symbols: List[str], redis_client, api_key: str = None, api_secret: str = None,
+                 async_redis_client=None):
         """
         Initialize WebSocket streamer
 
         Args:
             symbols: List of trading symbols (e.g., ['SOLUSDT'])
             redis_client: Redis client for caching
-            api_key: Binance API key
-            api_secret: Binance API secret
+            api_key: Binance API key (unused, market streams are public)
+            api_secret: Binance API secret (unused, market streams are public)
+            async_redis_client: Optional redis.asyncio client for reads from the bot loop
         """
         self.symbols = symbols
         self.redis = redis_client
+        self.async_redis = async_redis_client
         self.logger = logging.getLogger(__name__)
 
-        # Initialize Binance client
-        self.client = Client(api_key, api_secret) if api_key else None
-        self.ws_manager = None
         self.is_running = False
+        self._tasks = []
 
-    def start(self):
-        """Start WebSocket streams"""
-        self.logger.info("Starting WebSocket streams...")
-        self.is_running = True
+        # Latest aggTrade event per symbol, written to Redis by _flush_trades
+        self._pending_trades = {}
 
-        try:
-            # Initialize WebSocket Manager
-            self.ws_manager = ThreadedWebsocketManager(
-                api_key=self.client.API_KEY if self.client else None,
-                api_secret=self.client.API_SECRET if self.client else None
-            )
-            self.ws_manager.start()
+        # Set whenever a 5m candle closes; the trading loop waits on it
+        self.kline_closed = asyncio.Event()
 
-            # Subscribe to streams for each symbol
-            for symbol in self.symbols:
-                self._subscribe_streams(symbol)
+        # Redis keys are built once per symbol rather than per message
+        self._keys = {symbol: _ticker_key(symbol) for symbol in symbols}
+        self._trade_keys = {symbol: _trade_key(symbol) for symbol in symbols}
 
-            self.logger.info(f"WebSocket streams started for {self.symbols}")
+        # Event type -> handler
+        self._handlers = {
+            'kline': self._handle_kline_message,
+            'markPriceUpdate': self._handle_mark_price_message,
+            'aggTrade': self._handle_trade_message
+        }
 
-        except Exception as e:
-            self.logger.error(f"Error starting WebSocket streams: {e}", exc_info=True)
-            self.is_running = False
+    def start(self):
+        """Start WebSocket streams as a task on the running event loop"""
+        self.logger.info("Starting WebSocket streams...")
+        self.is_running = True
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self.run()), loop.create_task(self._flush_trades())]
 
-    def _subscribe_streams(self, symbol: str):
+    def _stream_url(self) -> str:
         """
-        Subscribe to all required streams for a symbol
+        Build the combined-stream URL for all symbols
 
-        Args:
-            symbol: Trading symbol
+        Each symbol subscribes to its 5m kline, mark price (for funding
+        rate) and aggregated trade streams.
         """
-        symbol_lower = symbol.lower()
-
-        # 1. Kline/Candlestick Stream (5m)
-        self.ws_manager.start_kline_futures_socket(
-            callback=self._handle_kline_message,
-            symbol=symbol,
-            interval='5m'
-        )
-        self.logger.info(f"Subscribed to {symbol} 5m kline stream")
-
-        # 2. Mark Price Stream (for funding rate)
-        self.ws_manager.start_mark_price_socket(
-            callback=self._handle_mark_price_message,
-            symbol=symbol
-        )
-        self.logger.info(f"Subscribed to {symbol} mark price stream")
-
-        # 3. Aggregated Trade Stream
-        self.ws_manager.start_aggtrade_futures_socket(
-            callback=self._handle_trade_message,
-            symbol=symbol
-        )
-        self.logger.info(f"Subscribed to {symbol} trade stream")
-
-    def _handle_kline_message(self, msg: Dict):
+        streams = []
+        for symbol in self.symbols:
+            symbol_lower = symbol.lower()
+            streams.extend([
+                f"{symbol_lower}@kline_5m",
+                f"{symbol_lower}@markPrice",
+                f"{symbol_lower}@aggTrade"
+            ])
+        return FUTURES_STREAM_URL + '/'.join(streams)
+
+    async def run(self):
+        """
+        Read the combined stream until stopped, reconnecting on errors
+        """
+        url = self._stream_url()
+
+        while self.is_running:
+            try:
+                # Binance sends uncompressed frames; skip permessage-deflate negotiation
+                async with websockets.connect(
+                    url,
+                    compression=None,
+                    max_size=2 ** 20,
+                    max_queue=2 ** 14,
+                    read_limit=2 ** 20,
+                    write_limit=2 ** 20
+                ) as ws:
+                    self.logger.info(f"WebSocket streams started for {self.symbols}")
+
+                    async for raw in ws:
+                        data = orjson.loads(raw)['data']
+                        handler = self._handlers.get(data['e'])
+                        if handler:
+                            await handler(data)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                self.logger.error(f"WebSocket stream error: {e}", exc_info=True)
+
+            if self.is_running:
+                self.logger.info(f"Reconnecting in {RECONNECT_DELAY}s...")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _handle_kline_message(self, msg: Dict):
         """
         Handle kline/candlestick messages
 
@@ -99,33 +150,32 @@ class BinanceWebSocketStreamer:
             msg: WebSocket message
         """
         try:
-            if msg['e'] == 'kline':
-                kline = msg['k']
-                symbol = msg['s']
-
-                # Extract kline data
-                data = {
-                    'timestamp': datetime.fromtimestamp(kline['t'] / 1000).isoformat(),
-                    'open': float(kline['o']),
-                    'high': float(kline['h']),
-                    'low': float(kline['l']),
-                    'close': float(kline['c']),
-                    'volume': float(kline['v']),
-                    'is_closed': kline['x']
-                }
-
-                # Store in Redis
-                key = f"latest_kline:{symbol}"
-                self.redis.set(key, json.dumps(data))
-                self.redis.expire(key, 3600)  # Expire in 1 hour
-
-                if kline['x']:  # If candle is closed
-                    self.logger.debug(f"{symbol} - New 5m candle closed: {data['close']}")
+            kline = msg['k']
+            symbol = msg['s']
+
+            # Stored as a positional row (see KLINE_FIELDS); readers rebuild the dict
+            close = float(kline['c'])
+            row = (
+                kline['t'],  # ms epoch
+                float(kline['o']),
+                float(kline['h']),
+                float(kline['l']),
+                close,
+                float(kline['v']),
+                kline['x']
+            )
+
+            # Store in Redis
+            await self._store_snapshot(self._keys[symbol], 'kline', row)
+
+            if kline['x']:  # If candle is closed
+                self.logger.debug(f"{symbol} - New 5m candle closed: {close}")
+                self.kline_closed.set()
 
         except Exception as e:
             self.logger.error(f"Error handling kline message: {e}", exc_info=True)
 
-    def _handle_mark_price_message(self, msg: Dict):
+    async def _handle_mark_price_message(self, msg: Dict):
         """
         Handle mark price messages (includes funding rate)
 
@@ -133,52 +183,158 @@ class BinanceWebSocketStreamer:
             msg: WebSocket message
         """
         try:
-            if msg['e'] == 'markPriceUpdate':
-                symbol = msg['s']
+            symbol = msg['s']
 
-                data = {
-                    'timestamp': datetime.fromtimestamp(msg['E'] / 1000).isoformat(),
-                    'mark_price': float(msg['p']),
-                    'index_price': float(msg['i']),
-                    'funding_rate': float(msg['r']),
-                    'next_funding_time': datetime.fromtimestamp(msg['T'] / 1000).isoformat()
-                }
+            data = {
+                'timestamp': msg['E'],  # ms epoch
+                'mark_price': float(msg['p']),
+                'index_price': float(msg['i']),
+                'funding_rate': float(msg['r']),
+                'next_funding_time': msg['T']  # ms epoch
+            }
 
-                # Store in Redis
-                key = f"latest_mark:{symbol}"
-                self.redis.set(key, json.dumps(data))
-                self.redis.expire(key, 3600)
+            # Store in Redis
+            await self._store_snapshot(self._keys[symbol], 'mark', data)
 
-                self.logger.debug(f"{symbol} - Funding rate: {data['funding_rate']:.4%}")
+            self.logger.debug("%s - Funding rate: %.4f%%", symbol, data['funding_rate'] * 100)
 
         except Exception as e:
             self.logger.error(f"Error handling mark price message: {e}", exc_info=True)
 
-    def _handle_trade_message(self, msg: Dict):
+    async def _handle_trade_message(self, msg: Dict):
         """
         Handle aggregated trade messages
 
+        aggTrade can fire hundreds of times per second while the bot only
+        reads once per loop, so the event is just kept in memory here and
+        the newest one per symbol is written by _flush_trades.
+
         Args:
             msg: WebSocket message
         """
+        self._pending_trades[msg['s']] = msg
+
+    async def _flush_trades(self):
+        """
+        Write the latest trade per symbol to Redis every TRADE_FLUSH_INTERVAL
+        """
+        while self.is_running:
+            await asyncio.sleep(TRADE_FLUSH_INTERVAL)
+
+            if not self._pending_trades:
+                continue
+
+            pending, self._pending_trades = self._pending_trades, {}
+
+            try:
+                writes = [
+                    (self._trade_keys[symbol], orjson.dumps({
+                        'timestamp': msg['T'],  # ms epoch
+                        'price': float(msg['p']),
+                        'quantity': float(msg['q']),
+                        'is_buyer_maker': msg['m']
+                    }))
+                    for symbol, msg in pending.items()
+                ]
+
+                def fill(pipe):
+                    for key, payload in writes:
+                        pipe.set(key, payload, ex=TRADE_TTL)
+
+                await self._execute_pipeline(fill)
+
+            except Exception as e:
+                self.logger.error(f"Error writing trade snapshots: {e}", exc_info=True)
+
+    async def _store_snapshot(self, key: bytes, field: str, data):
+        """
+        Store a snapshot in the per-symbol ticker hash
+
+        HSET and EXPIRE are sent as one pipelined round-trip.
+
+        Args:
+            key: Ticker hash key of the symbol
+            field: Hash field ('kline' or 'mark')
+            data: Snapshot data (dict, or row tuple for klines)
+        """
+        payload = orjson.dumps(data)
+
+        def fill(pipe):
+            pipe.hset(key, field, payload)
+            pipe.expire(key, TICKER_TTL)
+
+        await self._execute_pipeline(fill)
+
+    async def _execute_pipeline(self, fill: Callable):
+        """
+        Run a non-transactional pipeline without blocking the event loop
+
+        The handlers run on the bot's event loop, so writes go through the
+        asyncio Redis client when one was given; otherwise the synchronous
+        pipeline is executed in a worker thread.
+
+        Args:
+            fill: Called with the pipeline to queue its commands
+        """
+        if self.async_redis is None:
+            await asyncio.to_thread(self._execute_pipeline_sync, fill)
+            return
+
+        pipe = self.async_redis.pipeline(transaction=False)
+        fill(pipe)
+        await pipe.execute()
+
+    def _execute_pipeline_sync(self, fill: Callable):
+        """Synchronous fallback for _execute_pipeline"""
+        pipe = self.redis.pipeline(transaction=False)
+        fill(pipe)
+        pipe.execute()
+
+    def get_latest_snapshot(self, symbol: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Get latest kline and funding data from Redis in a single HMGET
+
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Tuple of (kline data, funding data), each None if unavailable
+        """
         try:
-            if msg['e'] == 'aggTrade':
-                symbol = msg['s']
+            kline, mark = self.redis.hmget(self._keys.get(symbol) or _ticker_key(symbol), ['kline', 'mark'])
+            return (
+                _decode_kline(kline) if kline else None,
+                orjson.loads(mark) if mark else None
+            )
+        except Exception as e:
+            self.logger.error(f"Error getting latest snapshot: {e}")
+            return None, None
 
-                data = {
-                    'timestamp': datetime.fromtimestamp(msg['T'] / 1000).isoformat(),
-                    'price': float(msg['p']),
-                    'quantity': float(msg['q']),
-                    'is_buyer_maker': msg['m']
-                }
+    async def get_latest_snapshot_async(self, symbol: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Awaitable get_latest_snapshot that does not block the event loop
 
-                # Store latest trade in Redis
-                key = f"latest_trade:{symbol}"
-                self.redis.set(key, json.dumps(data))
-                self.redis.expire(key, 60)  # Expire in 1 minute
+        Uses the asyncio Redis client when one was given, otherwise runs
+        the synchronous read in a worker thread.
 
+        Args:
+            symbol: Trading symbol
+
+        Returns:
+            Tuple of (kline data, funding data), each None if unavailable
+        """
+        if self.async_redis is None:
+            return await asyncio.to_thread(self.get_latest_snapshot, symbol)
+
+        try:
+            kline, mark = await self.async_redis.hmget(self._keys.get(symbol) or _ticker_key(symbol), ['kline', 'mark'])
+            return (
+                _decode_kline(kline) if kline else None,
+                orjson.loads(mark) if mark else None
+            )
         except Exception as e:
-            self.logger.error(f"Error handling trade message: {e}", exc_info=True)
+            self.logger.error(f"Error getting latest snapshot: {e}")
+            return None, None
 
     def get_latest_kline(self, symbol: str) -> Optional[Dict]:
         """
@@ -191,9 +347,8 @@ class BinanceWebSocketStreamer:
             Latest kline data or None
         """
         try:
-            key = f"latest_kline:{symbol}"
-            data = self.redis.get(key)
-            return json.loads(data) if data else None
+            data = self.redis.hget(self._keys.get(symbol) or _ticker_key(symbol), 'kline')
+            return _decode_kline(data) if data else None
         except Exception as e:
             self.logger.error(f"Error getting latest kline: {e}")
             return None
@@ -209,9 +364,8 @@ class BinanceWebSocketStreamer:
             Latest funding data or None
         """
         try:
-            key = f"latest_mark:{symbol}"
-            data = self.redis.get(key)
-            return json.loads(data) if data else None
+            data = self.redis.hget(self._keys.get(symbol) or _ticker_key(symbol), 'mark')
+            return orjson.loads(data) if data else None
         except Exception as e:
             self.logger.error(f"Error getting latest funding: {e}")
             return None
@@ -221,6 +375,8 @@ class BinanceWebSocketStreamer:
         self.logger.info("Stopping WebSocket streams...")
         self.is_running = False
 
-        if self.ws_manager:
-            self.ws_manager.stop()
+        if self._tasks:
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = []
             self.logger.info("WebSocket streams stopped")
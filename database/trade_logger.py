@@ -3,11 +3,31 @@ Trade Logger
 Logs all trades and account history to database
 """
 
+import atexit
 import logging
-from typing import Dict, List, Optional
+import struct
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime, timedelta
-import json
+from dateutil import tz
 import os
+import numpy as np
+import orjson
+
+if TYPE_CHECKING:
+    from execution.position import Position
+
+WRITE_BUFFER_SIZE = 1 << 16
+JSONL_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+FLUSH_INTERVAL = 5.0  # seconds an equity snapshot may sit in the write buffer
+
+# Sidecar index: one fixed-size record per log line, in write order.
+# Bump INDEX_VERSION when the layout changes; the new file is built from the log.
+INDEX_VERSION = 2
+INDEX_RECORD = struct.Struct('<qqBd')  # epoch ns, byte offset of the line, record type, value
+INDEX_DTYPE = np.dtype([('ts', '<i8'), ('offset', '<i8'), ('type', 'u1'), ('value', '<f8')])
+RECORD_TYPES = {'entry': 1, 'exit': 2, 'equity': 3}
+INDEX_VALUES = {'exit': 'pnl', 'equity': 'equity'}  # field copied into the index value column
 
 
 class TradeLogger:
@@ -25,78 +45,103 @@ class TradeLogger:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.log_file = "./logs/trades.jsonl"
+        self.index_file = f"{os.path.splitext(self.log_file)[0]}.v{INDEX_VERSION}.idx"
 
         # Create logs directory
         os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
 
+        # Append handles, opened on first write so read-only users never hold one
+        self._fh = None
+        self._index_fh = None
+        self._offset = 0  # byte offset of the next line in the log
+        self._last_flush = 0.0
+
+        # Last formatted second, reused by _format_timestamp
+        self._iso_second = None
+        self._iso_prefix = ''
+
         # In production, would connect to PostgreSQL/TimescaleDB
         self.logger.info(f"Trade logger initialized (file mode: {self.log_file})")
 
-    def log_entry(self, position: Dict):
+    def log_entry(self, position: 'Position', ts_ns: Optional[int] = None):
         """
         Log position entry
 
         Args:
-            position: Position dictionary
+            position: Opened position
+            ts_ns: Event time in epoch nanoseconds (defaults to now)
         """
         try:
+            if ts_ns is None:
+                ts_ns = time.time_ns()
             entry_log = {
                 'type': 'entry',
-                'timestamp': datetime.now().isoformat(),
-                'direction': position.get('direction'),
-                'entry_price': position.get('entry_price'),
-                'size': position.get('size'),
-                'stop_loss': position.get('stop_loss'),
-                'take_profit': position.get('take_profit'),
-                'ml_confidence': position.get('ml_confidence')
+                'timestamp': self._format_timestamp(ts_ns),
+                'ts_ns': ts_ns,
+                'direction': position.direction,
+                'entry_price': position.entry_price,
+                'size': position.size,
+                'stop_loss': position.stop_loss,
+                'take_profit': position.take_profit,
+                'ml_confidence': position.ml_confidence
             }
 
-            self._write_log(entry_log)
+            self._write_log(entry_log, flush=True)
             self.logger.info(f"Position entry logged: {entry_log}")
 
         except Exception as e:
-            self.logger.error(f"Error logging entry: {e}", exc_info=True)
+            self.logger.error(f"Error logging entry: {type(e).__name__}: {e}")
+            self.logger.debug("Error logging entry", exc_info=True)
 
-    def log_exit(self, position: Dict, exit_price: float, pnl: float):
+    def log_exit(self, position: 'Position', exit_price: float, pnl: float, ts_ns: Optional[int] = None):
         """
         Log position exit
 
         Args:
-            position: Position dictionary
+            position: Closed position
             exit_price: Exit price
             pnl: Realized PnL
+            ts_ns: Event time in epoch nanoseconds (defaults to now)
         """
         try:
+            if ts_ns is None:
+                ts_ns = time.time_ns()
             exit_log = {
                 'type': 'exit',
-                'timestamp': datetime.now().isoformat(),
-                'direction': position.get('direction'),
-                'entry_price': position.get('entry_price'),
+                'timestamp': self._format_timestamp(ts_ns),
+                'ts_ns': ts_ns,
+                'direction': position.direction,
+                'entry_price': position.entry_price,
                 'exit_price': exit_price,
-                'size': position.get('size'),
+                'size': position.size,
                 'pnl': pnl,
-                'pnl_pct': (pnl / (position['entry_price'] * position['size'])) * 100 if position.get('entry_price') and position.get('size') else 0,
-                'duration': position.get('duration', 0)
+                'pnl_pct': (pnl / (position.entry_price * position.size)) * 100 if position.entry_price and position.size else 0,
+                'duration': position.duration
             }
 
-            self._write_log(exit_log)
+            self._write_log(exit_log, flush=True)
             self.logger.info(f"Position exit logged: PnL=${pnl:.2f}")
 
         except Exception as e:
-            self.logger.error(f"Error logging exit: {e}", exc_info=True)
+            self.logger.error(f"Error logging exit: {type(e).__name__}: {e}")
+            self.logger.debug("Error logging exit", exc_info=True)
 
-    def log_equity(self, equity: float, pnl: float):
+    def log_equity(self, equity: float, pnl: float, ts_ns: Optional[int] = None):
         """
         Log equity snapshot
 
         Args:
             equity: Current equity
             pnl: Current PnL
+            ts_ns: Snapshot time in epoch nanoseconds (defaults to now)
         """
         try:
+            if ts_ns is None:
+                ts_ns = time.time_ns()
             equity_log = {
                 'type': 'equity',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': self._format_timestamp(ts_ns),
+                'ts_ns': ts_ns,
                 'equity': equity,
                 'pnl': pnl
             }
@@ -104,7 +149,8 @@ class TradeLogger:
             self._write_log(equity_log)
 
         except Exception as e:
-            self.logger.error(f"Error logging equity: {e}", exc_info=True)
+            self.logger.error(f"Error logging equity: {type(e).__name__}: {e}")
+            self.logger.debug("Error logging equity", exc_info=True)
 
     def get_recent_trades(self, limit: int = 10) -> List[Dict]:
         """
@@ -120,13 +166,10 @@ class TradeLogger:
             trades = []
 
             if os.path.exists(self.log_file):
-                with open(self.log_file, 'r') as f:
-                    lines = f.readlines()
-
-                # Get last N exit entries
-                for line in reversed(lines):
+                # Get last N exit entries, reading the file from the end
+                for line in self._iter_lines_reversed():
                     try:
-                        log_entry = json.loads(line)
+                        log_entry = orjson.loads(line)
                         if log_entry.get('type') == 'exit':
                             trades.append(log_entry)
                             if len(trades) >= limit:
@@ -140,6 +183,33 @@ class TradeLogger:
             self.logger.error(f"Error getting recent trades: {e}")
             return []
 
+    def _iter_lines_reversed(self, chunk_size: int = 1 << 16):
+        """
+        Yield the log file's lines (as bytes) from last to first
+
+        Reads backwards in chunk_size blocks, so finding the most recent
+        records costs time proportional to how far back they are rather
+        than to the size of the file.
+        """
+        with open(self.log_file, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            tail = b''
+
+            while position > 0:
+                read_size = min(chunk_size, position)
+                position -= read_size
+                f.seek(position)
+                lines = (f.read(read_size) + tail).split(b'\n')
+
+                # The first piece may be the end of a line that starts in an earlier chunk
+                tail = lines[0]
+                for line in reversed(lines[1:]):
+                    if line:
+                        yield line
+
+            if tail:
+                yield tail
+
     def get_equity_history(self, days: int = 7):
         """
         Get equity history
@@ -153,32 +223,39 @@ class TradeLogger:
         try:
             import pandas as pd
 
-            equity_records = []
+            cutoff_time = datetime.now() - timedelta(days=days)
+            ts_ns, equity = self._query_values('equity', int(cutoff_time.timestamp() * 1e9))
 
-            if os.path.exists(self.log_file):
-                cutoff_time = datetime.now() - timedelta(days=days)
-
-                with open(self.log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            log_entry = json.loads(line)
-                            if log_entry.get('type') == 'equity':
-                                timestamp = datetime.fromisoformat(log_entry['timestamp'])
-                                if timestamp >= cutoff_time:
-                                    equity_records.append({
-                                        'timestamp': timestamp,
-                                        'equity': log_entry['equity']
-                                    })
-                        except:
-                            continue
-
-            return pd.DataFrame(equity_records)
+            # Epoch ns -> naive local time, matching the ISO timestamps in the log
+            timestamps = pd.to_datetime(ts_ns, unit='ns', utc=True).tz_convert(tz.tzlocal()).tz_localize(None)
+
+            return pd.DataFrame({'timestamp': timestamps, 'equity': equity})
 
         except Exception as e:
             self.logger.error(f"Error getting equity history: {e}")
             import pandas as pd
             return pd.DataFrame()
 
+    def get_equity_since(self, since_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get equity snapshots timestamped after a given time
+
+        For pollers that already hold the history up to since_ns and only
+        need the new points; answered from the index value column.
+
+        Args:
+            since_ns: Epoch-ns timestamp of the last snapshot already seen
+
+        Returns:
+            (epoch ns, equity) arrays in time order
+        """
+        try:
+            return self._query_values('equity', since_ns + 1)
+
+        except Exception as e:
+            self.logger.error(f"Error getting equity updates: {e}")
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
     def get_trades_last_n_hours(self, hours: int) -> List[Dict]:
         """
         Get trades from last N hours
@@ -190,22 +267,8 @@ class TradeLogger:
             List of trade dictionaries
         """
         try:
-            trades = []
             cutoff_time = datetime.now() - timedelta(hours=hours)
-
-            if os.path.exists(self.log_file):
-                with open(self.log_file, 'r') as f:
-                    for line in f:
-                        try:
-                            log_entry = json.loads(line)
-                            if log_entry.get('type') == 'exit':
-                                timestamp = datetime.fromisoformat(log_entry['timestamp'])
-                                if timestamp >= cutoff_time:
-                                    trades.append(log_entry)
-                        except:
-                            continue
-
-            return trades
+            return self._query_log('exit', cutoff_time)
 
         except Exception as e:
             self.logger.error(f"Error getting trades: {e}")
@@ -215,11 +278,252 @@ class TradeLogger:
         """Get trades from last N days"""
         return self.get_trades_last_n_hours(days * 24)
 
-    def _write_log(self, log_entry: Dict):
-        """Write log entry to file"""
+    def iter_trades_last_n_days(self, days: int, chunk_days: int = 1) -> Iterator[List[Dict]]:
+        """
+        Iterate over trades from last N days in time-ordered chunks
+
+        Only one chunk of records is held in memory at a time, so long
+        look-backs can be consumed incrementally.
+
+        Args:
+            days: Number of days to look back
+            chunk_days: Days of trades per yielded chunk
+
+        Yields:
+            Non-empty lists of trade dictionaries, oldest chunk first
+        """
+        if not os.path.exists(self.log_file):
+            return
+
+        self.flush()  # include records still in this process's write buffer
+
+        index = self._read_index()
+        cutoff_ns = int((datetime.now() - timedelta(days=days)).timestamp() * 1e9)
+        hits = self._index_hits(index, 'exit', cutoff_ns)
+
+        # Split the time-sorted index rows at each chunk boundary
+        day_ns = 86_400 * 1_000_000_000
+        edges = np.arange(cutoff_ns, cutoff_ns + days * day_ns, chunk_days * day_ns)[1:]
+        bounds = np.searchsorted(hits['ts'], edges)
+
+        with open(self.log_file, 'rb') as f:
+            for offsets in np.split(hits['offset'], bounds):
+                trades = self._read_indexed(f, offsets)
+                if trades:
+                    yield trades
+
+            tail = self._scan_unindexed(f, index, 'exit', cutoff_ns)
+            if tail:
+                yield tail
+
+    def _format_timestamp(self, ts_ns: int) -> str:
+        """
+        Local-time ISO 8601 string for an epoch-ns timestamp
+
+        The date/time part is formatted once per second and reused; only the
+        microseconds are filled in per call.
+        """
+        second, nanos = divmod(ts_ns, 1_000_000_000)
+        if second != self._iso_second:
+            self._iso_second = second
+            self._iso_prefix = datetime.fromtimestamp(second).isoformat()
+        return f"{self._iso_prefix}.{nanos // 1000:06d}"
+
+    @staticmethod
+    def _record_ts_ns(log_entry: Dict) -> int:
+        """Epoch-ns time of a log record (older records only carry the ISO timestamp)"""
+        ts_ns = log_entry.get('ts_ns')
+        if ts_ns is None:
+            ts_ns = int(datetime.fromisoformat(log_entry['timestamp']).timestamp() * 1e9)
+        return ts_ns
+
+    def _query_log(self, record_type: str, cutoff_time: datetime) -> List[Dict]:
+        """
+        Get records of one type written at or after cutoff_time
+
+        The sidecar index is searched for the cutoff and only the matching
+        lines are read. Lines past the end of the index (written
+        by an older version, or not yet indexed) are scanned directly.
+        """
+        if not os.path.exists(self.log_file):
+            return []
+
+        self.flush()  # include records still in this process's write buffer
+
+        index = self._read_index()
+        cutoff_ns = int(cutoff_time.timestamp() * 1e9)
+
+        with open(self.log_file, 'rb') as f:
+            records = self._read_indexed(f, self._index_hits(index, record_type, cutoff_ns)['offset'])
+            records.extend(self._scan_unindexed(f, index, record_type, cutoff_ns))
+
+        return records
+
+    def _query_values(self, record_type: str, cutoff_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get (epoch ns, value) arrays for records of one type at or after cutoff_ns, in time order
+
+        Indexed records are answered from the index value column alone, with
+        no reads from the log; only unindexed lines are parsed.
+        """
+        if not os.path.exists(self.log_file):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        self.flush()  # include records still in this process's write buffer
+
+        index = self._read_index()
+        hits = self._index_hits(index, record_type, cutoff_ns)
+
+        with open(self.log_file, 'rb') as f:
+            tail = self._scan_unindexed(f, index, record_type, cutoff_ns)
+
+        if not tail:
+            return hits['ts'], hits['value']
+
+        field = INDEX_VALUES[record_type]
+        ts_ns = np.concatenate([hits['ts'], [self._record_ts_ns(r) for r in tail]]).astype(np.int64)
+        values = np.concatenate([hits['value'], [r[field] for r in tail]])
+        order = np.argsort(ts_ns, kind='stable')
+        return ts_ns[order], values[order]
+
+    @staticmethod
+    def _index_hits(index: np.ndarray, record_type: str, cutoff_ns: int) -> np.ndarray:
+        """
+        Index rows of record_type at or after cutoff_ns, in time order
+
+        Rows are binary-searched when the index is in time order. A caller
+        supplied ts_ns or a clock step can write rows out of order; the
+        index is then filtered by mask and the hits sorted by time.
+        """
+        ts = index['ts']
+        if np.all(ts[1:] >= ts[:-1]):
+            hits = index[np.searchsorted(ts, cutoff_ns):]
+            return hits[hits['type'] == RECORD_TYPES[record_type]]
+
+        hits = index[(ts >= cutoff_ns) & (index['type'] == RECORD_TYPES[record_type])]
+        return hits[np.argsort(hits['ts'], kind='stable')]
+
+    def _read_indexed(self, f, offsets: np.ndarray) -> List[Dict]:
+        """Parse the log lines at the given offsets, skipping any that do not parse"""
+        records = []
+        for offset in offsets:
+            f.seek(offset)
+            try:
+                records.append(orjson.loads(f.readline()))
+            except Exception:
+                self.logger.debug("Skipping unreadable log record at offset %d", offset)
+        return records
+
+    def _scan_unindexed(self, f, index: np.ndarray, record_type: str, cutoff_ns: int) -> List[Dict]:
+        """Parse log lines past the end of the index (written by an older version, or not yet indexed)"""
+        records = []
+        f.seek(self._indexed_end(f, index))
+        for line in f:
+            try:
+                log_entry = orjson.loads(line)
+                if log_entry.get('type') == record_type and self._record_ts_ns(log_entry) >= cutoff_ns:
+                    records.append(log_entry)
+            except Exception:
+                continue
+        return records
+
+    def _index_record(self, log_entry: Dict, offset: int) -> bytes:
+        """Packed sidecar index record for a log line starting at offset"""
+        record_type = log_entry.get('type')
+        field = INDEX_VALUES.get(record_type)
+        return INDEX_RECORD.pack(
+            self._record_ts_ns(log_entry),
+            offset,
+            RECORD_TYPES.get(record_type, 0),
+            log_entry[field] if field else np.nan
+        )
+
+    def _read_index(self) -> np.ndarray:
+        """Load the sidecar index, ignoring a partially written last record"""
+        if not os.path.exists(self.index_file):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        count = os.path.getsize(self.index_file) // INDEX_DTYPE.itemsize
+        return np.fromfile(self.index_file, dtype=INDEX_DTYPE, count=count)
+
+    @staticmethod
+    def _indexed_end(f, index: np.ndarray) -> int:
+        """Byte offset just past the last log line covered by the index"""
+        if len(index) == 0:
+            return 0
+        offset = int(index['offset'][-1])
+        f.seek(offset)
+        return offset + len(f.readline())
+
+    def _open_for_append(self):
+        """Open the log and index handles, rebuilding the index if it is missing or behind"""
+        self._fh = open(self.log_file, 'ab', buffering=WRITE_BUFFER_SIZE)
+        self._offset = self._fh.tell()
+
+        index = self._read_index()
+        truncated = (
+            os.path.exists(self.index_file)
+            and os.path.getsize(self.index_file) != index.nbytes
+        )
+        with open(self.log_file, 'rb') as f:
+            behind = self._indexed_end(f, index) != self._offset
+        if truncated or behind:
+            self._rebuild_index()
+
+        self._index_fh = open(self.index_file, 'ab', buffering=WRITE_BUFFER_SIZE)
+        atexit.register(self.close)
+
+    def _rebuild_index(self):
+        """Rebuild the sidecar index from the log file"""
+        self.logger.info(f"Rebuilding trade log index {self.index_file}")
+        tmp_file = self.index_file + '.tmp'
+
+        with open(self.log_file, 'rb') as f, open(tmp_file, 'wb') as out:
+            offset = 0
+            for line in f:
+                try:
+                    out.write(self._index_record(orjson.loads(line), offset))
+                except Exception:
+                    pass
+                offset += len(line)
+
+        os.replace(tmp_file, self.index_file)
+
+    def _write_log(self, log_entry: Dict, flush: bool = False):
+        """
+        Write log entry to file
+
+        Writes go through a persistent buffered handle. Trade entries and
+        exits are flushed immediately; equity snapshots are flushed at most
+        FLUSH_INTERVAL seconds after being written.
+        """
         try:
-            with open(self.log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            if self._fh is None:
+                self._open_for_append()
+
+            line = orjson.dumps(log_entry, option=JSONL_OPTIONS)
+            self._fh.write(line)
+            self._index_fh.write(self._index_record(log_entry, self._offset))
+            self._offset += len(line)
+
+            if flush or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self.flush()
 
         except Exception as e:
-            self.logger.error(f"Error writing log: {e}", exc_info=True)
+            self.logger.error(f"Error writing log: {type(e).__name__}: {e}")
+            self.logger.debug("Error writing log", exc_info=True)
+
+    def flush(self):
+        """Flush buffered log entries to disk (log first, so the index never points past it)"""
+        if self._fh is not None:
+            self._fh.flush()
+            self._index_fh.flush()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and close the log file handles"""
+        if self._fh is not None:
+            self._fh.close()
+            self._index_fh.close()
+            self._fh = None
+            self._index_fh = None
+            atexit.unregister(self.close)
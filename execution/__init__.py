@@ -3,5 +3,6 @@ Order execution module
 """
 
 from .order_executor import OrderExecutor
+from .position import Position, ExchangePosition
 
-__all__ = ['OrderExecutor']
+__all__ = ['OrderExecutor', 'Position', 'ExchangePosition']
@@ -5,17 +5,35 @@ Handles order placement, modification, and tracking on Binance Futures
 
 import asyncio
 import logging
-from typing import Dict, Optional
+import math
+import random
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Tuple
+import pandas as pd
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from .position import ExchangePosition
 import time
 
+# (step size, tick size, quantity formatter, price formatter) used when
+# exchange info is unavailable for a symbol
+DEFAULT_PRECISION = (0.001, 0.01, '{:.3f}'.format, '{:.2f}'.format)
+
+# Retry policy for Binance API errors
+MAX_RETRY_DELAY = 10.0  # seconds, before jitter
+RATE_LIMIT_CODES = {-1003}  # too many requests: back off harder
+NON_RETRYABLE_CODES = {-2019}  # margin is insufficient: retrying cannot succeed
+
 
 class OrderExecutor:
     """
     Execute orders on Binance Futures with retry logic and safety checks
     """
 
+    # Placeholder open-interest frames, built once; callers only read them
+    _OI_PLACEHOLDER = pd.DataFrame({'sum_open_interest': [1000000]})
+    _OI_UNAVAILABLE = pd.DataFrame({'sum_open_interest': [0]})
+
     def __init__(self, config: Dict):
         """
         Initialize order executor
@@ -41,7 +59,11 @@ class OrderExecutor:
         # Order tracking
         self.active_orders = {}
         self.max_retries = 3
-        self.retry_delay = 2  # seconds
+        self.retry_delay = 2  # seconds, doubled per attempt
+        self.max_retry_time = config.get('max_retry_time', 15)  # seconds across all attempts
+
+        # Per-symbol (step size, tick size, quantity formatter, price formatter)
+        self._precision = self._load_precision()
 
     async def place_market_order(
         self,
@@ -68,14 +90,18 @@ class OrderExecutor:
 
         self.logger.info(f"Placing {side} market order for {quantity} {symbol}")
 
+        deadline = time.monotonic() + self.max_retry_time
+
         for attempt in range(self.max_retries):
             try:
-                # Place market order
-                order = self.client.futures_create_order(
+                # Place market order (in a worker thread so the event loop keeps running)
+                order = await asyncio.to_thread(
+                    self.client.futures_create_order,
                     symbol=symbol,
                     side=side,
                     type='MARKET',
-                    quantity=self._format_quantity(quantity, symbol)
+                    quantity=self._format_quantity(quantity, symbol),
+                    newOrderRespType='RESULT'  # response carries the fill (avgPrice, executedQty)
                 )
 
                 self.logger.info(f"Order placed successfully: {order['orderId']}")
@@ -86,8 +112,9 @@ class OrderExecutor:
                 # Get filled price
                 filled_price = float(order.get('avgPrice', 0))
                 if filled_price == 0:
-                    # Fetch order details
-                    order_status = self.client.futures_get_order(
+                    # Not filled by the time the response was built - fetch order details
+                    order_status = await asyncio.to_thread(
+                        self.client.futures_get_order,
                         symbol=symbol,
                         orderId=order['orderId']
                     )
@@ -105,15 +132,21 @@ class OrderExecutor:
             except BinanceAPIException as e:
                 self.logger.error(f"Binance API error (attempt {attempt + 1}): {e}")
 
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-                else:
-                    # Final attempt failed
+                if e.code in NON_RETRYABLE_CODES or attempt == self.max_retries - 1:
                     return {
                         'status': 'FAILED',
                         'error': str(e)
                     }
 
+                delay = self._retry_backoff(attempt, e.code)
+                if time.monotonic() + delay > deadline:
+                    return {
+                        'status': 'FAILED',
+                        'error': f"Retry deadline exceeded: {e}"
+                    }
+
+                await asyncio.sleep(delay)
+
             except Exception as e:
                 self.logger.error(f"Unexpected error placing order: {e}", exc_info=True)
                 return {
@@ -145,7 +178,8 @@ class OrderExecutor:
         self.logger.info(f"Placing {side} limit order for {quantity} {symbol} @ ${price}")
 
         try:
-            order = self.client.futures_create_order(
+            order = await asyncio.to_thread(
+                self.client.futures_create_order,
                 symbol=symbol,
                 side=side,
                 type='LIMIT',
@@ -181,7 +215,8 @@ class OrderExecutor:
             True if cancelled successfully
         """
         try:
-            result = self.client.futures_cancel_order(
+            result = await asyncio.to_thread(
+                self.client.futures_cancel_order,
                 symbol=symbol,
                 orderId=order_id
             )
@@ -227,7 +262,11 @@ class OrderExecutor:
                 'margin_balance': 0
             }
 
-    def get_position(self, symbol: str) -> Optional[Dict]:
+    async def get_account_info_async(self) -> Dict:
+        """get_account_info without blocking the event loop"""
+        return await asyncio.to_thread(self.get_account_info)
+
+    def get_position(self, symbol: str) -> Optional[ExchangePosition]:
         """
         Get current position for a symbol
 
@@ -245,14 +284,14 @@ class OrderExecutor:
                     position_amt = float(position['positionAmt'])
 
                     if position_amt != 0:
-                        return {
-                            'symbol': symbol,
-                            'size': abs(position_amt),
-                            'direction': 1 if position_amt > 0 else -1,
-                            'entry_price': float(position['entryPrice']),
-                            'unrealized_pnl': float(position['unRealizedProfit']),
-                            'leverage': int(position['leverage'])
-                        }
+                        return ExchangePosition(
+                            symbol,
+                            abs(position_amt),
+                            1 if position_amt > 0 else -1,
+                            float(position['entryPrice']),
+                            float(position['unRealizedProfit']),
+                            int(position['leverage'])
+                        )
 
             return None
 
@@ -260,6 +299,10 @@ class OrderExecutor:
             self.logger.error(f"Error getting position: {e}", exc_info=True)
             return None
 
+    async def get_position_async(self, symbol: str) -> Optional[ExchangePosition]:
+        """get_position without blocking the event loop"""
+        return await asyncio.to_thread(self.get_position, symbol)
+
     async def fetch_open_interest_hist(self, symbol: str, period: str = '5m', limit: int = 1):
         """
         Fetch Open Interest history (placeholder)
@@ -274,14 +317,12 @@ class OrderExecutor:
         """
         try:
             # This is a placeholder - implement actual OI fetching
-            import pandas as pd
             # In real implementation, fetch from Binance futures_open_interest_hist
-            return pd.DataFrame({'sum_open_interest': [1000000]})
+            return self._OI_PLACEHOLDER
 
         except Exception as e:
             self.logger.error(f"Error fetching OI: {e}")
-            import pandas as pd
-            return pd.DataFrame({'sum_open_interest': [0]})
+            return self._OI_UNAVAILABLE
 
     def set_leverage(self, symbol: str, leverage: int):
         """
@@ -301,12 +342,67 @@ class OrderExecutor:
         except Exception as e:
             self.logger.error(f"Error setting leverage: {e}", exc_info=True)
 
+    def _retry_backoff(self, attempt: int, error_code: int) -> float:
+        """
+        Delay before retrying after a failed attempt
+
+        Exponential in the attempt number, longer for rate-limit errors,
+        capped at MAX_RETRY_DELAY and jittered by +/-50% so retries from
+        several clients do not line up.
+        """
+        delay = self.retry_delay * 2 ** attempt
+        if error_code in RATE_LIMIT_CODES:
+            delay *= 4
+        return min(delay, MAX_RETRY_DELAY) * (0.5 + random.random())
+
+    def _load_precision(self) -> Dict[str, Tuple[float, float, Callable, Callable]]:
+        """
+        Fetch lot step and price tick sizes for all symbols (one exchangeInfo call)
+
+        The format spec for each symbol is bound once here ('{:.3f}'.format),
+        so formatting an order value does not rebuild it per call.
+
+        Returns:
+            Dictionary of symbol -> (step size, tick size, quantity formatter, price formatter)
+        """
+        precision = {}
+        try:
+            exchange_info = self.client.futures_exchange_info()
+
+            for symbol_info in exchange_info['symbols']:
+                filters = {f['filterType']: f for f in symbol_info['filters']}
+                step = filters['LOT_SIZE']['stepSize']
+                tick = filters['PRICE_FILTER']['tickSize']
+                precision[symbol_info['symbol']] = (
+                    float(step),
+                    float(tick),
+                    f"{{:.{_decimals(step)}f}}".format,
+                    f"{{:.{_decimals(tick)}f}}".format
+                )
+
+            self.logger.info(f"Loaded precision for {len(precision)} symbols")
+
+        except Exception as e:
+            self.logger.error(f"Error loading exchange info, using default precision: {e}")
+
+        return precision
+
+    def _get_precision(self, symbol: str) -> Tuple[float, float, Callable, Callable]:
+        """Cached precision for symbol, falling back to the defaults"""
+        return self._precision.get(symbol, DEFAULT_PRECISION)
+
     def _format_quantity(self, quantity: float, symbol: str) -> str:
-        """Format quantity according to symbol precision"""
-        # Simplified - in production, fetch from exchange info
-        return f"{quantity:.3f}"
+        """Format quantity according to symbol precision (rounded down to the lot step)"""
+        step, _, format_quantity, _ = self._get_precision(symbol)
+        # Small epsilon so e.g. 0.3 / 0.1 = 2.9999999999999996 still floors to 3 steps
+        return format_quantity(math.floor(quantity / step + 1e-9) * step)
 
     def _format_price(self, price: float, symbol: str) -> str:
-        """Format price according to symbol precision"""
-        # Simplified - in production, fetch from exchange info
-        return f"{price:.2f}"
+        """Format price according to symbol precision (rounded to the price tick)"""
+        _, tick, _, format_price = self._get_precision(symbol)
+        return format_price(round(price / tick) * tick)
+
+
+def _decimals(size: str) -> int:
+    """Number of decimal places in an exchange step/tick size string such as '0.0010'"""
+    return max(0, -Decimal(size).normalize().as_tuple().exponent)
@@ -0,0 +1,47 @@
+"""
+Position records shared by the trading bot, order executor and trade logger
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Position:
+    """
+    Currently open position
+
+    Slotted so the per-tick mark-to-market updates are plain attribute
+    stores rather than dict writes.
+    """
+    direction: int  # 1 = long, -1 = short
+    entry_price: float
+    size: float
+    entry_time: datetime
+    stop_loss: float
+    take_profit: float
+    ml_confidence: float
+    duration: int = 0  # loop iterations since entry
+    unrealized_pnl: float = 0.0
+
+    def pnl(self, price: float) -> float:
+        """PnL of the position marked at price"""
+        return (price - self.entry_price) * self.size * self.direction
+
+    def mark(self, price: float):
+        """Update unrealized PnL at price and count one more period held"""
+        self.unrealized_pnl = self.pnl(price)
+        self.duration += 1
+
+
+@dataclass(slots=True)
+class ExchangePosition:
+    """
+    Position as reported by the exchange for one symbol
+    """
+    symbol: str
+    size: float
+    direction: int  # 1 = long, -1 = short
+    entry_price: float
+    unrealized_pnl: float
+    leverage: int
@@ -3,11 +3,155 @@ Feature Engineering for Live Trading
 Computes features in real-time from market data
 """
 
+import math
 import numpy as np
 import pandas as pd
 from typing import Dict, List
 import logging
 
+MAX_HISTORY = 100  # periods kept for rolling calculations
+STAT_WINDOW = 20  # window of the running mean/std statistics
+RSI_PERIOD = 14
+PRICE_FIELDS = ('close', 'high', 'low', 'open', 'volume')
+CLOSE, HIGH, LOW, OPEN, VOLUME = range(len(PRICE_FIELDS))
+
+
+class _RingBuffer:
+    """
+    Fixed-size float history stored column-wise (one row per field)
+
+    Every sample is written twice, size slots apart, so the last n samples
+    are always a contiguous slice and reads never copy or wrap.
+
+    Running sums over the last stat_window samples give O(1) mean/std. The
+    sums are taken relative to a shift value (close to the data) to limit
+    cancellation, and are recomputed exactly every size samples so
+    rounding error cannot accumulate.
+    """
+
+    __slots__ = ('size', 'count', 'stat_window', '_buf', '_shift', '_sum', '_sumsq')
+
+    def __init__(self, size: int, width: int = 1, stat_window: int = STAT_WINDOW):
+        self.size = size
+        self.count = 0
+        self.stat_window = stat_window
+        self._buf = np.zeros((width, 2 * size), dtype=np.float64)
+        self._shift = np.zeros(width)
+        self._sum = np.zeros(width)
+        self._sumsq = np.zeros(width)
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def append(self, values):
+        """Append one sample (a scalar, or one value per field)"""
+        slot = self.count % self.size
+
+        if self.count == 0:
+            self._shift[:] = values
+        if self.count >= self.stat_window:
+            evicted = self._buf[:, (self.count - self.stat_window) % self.size] - self._shift
+            self._sum -= evicted
+            self._sumsq -= evicted * evicted
+
+        self._buf[:, slot] = values
+        self._buf[:, slot + self.size] = values
+        self.count += 1
+
+        if self.count % self.size == 0:
+            self._resync()
+        else:
+            added = self._buf[:, slot] - self._shift
+            self._sum += added
+            self._sumsq += added * added
+
+    def _resync(self):
+        """Recompute the running sums exactly from the current window"""
+        window = self.window(self.stat_window).reshape(len(self._shift), -1)
+        self._shift[:] = window.mean(axis=1)
+        centered = window - self._shift[:, None]
+        self._sum[:] = centered.sum(axis=1)
+        self._sumsq[:] = (centered * centered).sum(axis=1)
+
+    def mean_std(self, field: int = 0):
+        """Population mean and std of field over the last stat_window samples"""
+        n = min(self.count, self.stat_window)
+        mean = self._sum[field] / n
+        mean_sq = self._sumsq[field] / n
+        var = mean_sq - mean * mean
+        # Differences at rounding level mean a flat window, as np.std would report
+        std = float(np.sqrt(var)) if var > 1e-12 * mean_sq else 0.0
+        return float(self._shift[field] + mean), std
+
+    def window(self, n: int = None) -> np.ndarray:
+        """
+        View of the last n samples, oldest first
+
+        Returns shape (width, n), or (n,) for a single-field buffer.
+        """
+        n = len(self) if n is None else min(n, len(self))
+        end = (self.count - 1) % self.size + self.size + 1
+        view = self._buf[:, end - n:end]
+        return view[0] if view.shape[0] == 1 else view
+
+
+class _RunningRSI:
+    """
+    RSI over the last period close-to-close changes, updated in O(1) per close
+
+    Uses the simple average of gains and losses over the window (as the
+    models were trained with), not Wilder's exponential smoothing. The
+    sums are recomputed from the window every period updates, and counts
+    of non-zero gains/losses keep an all-flat side exactly zero.
+    """
+
+    __slots__ = ('period', 'count', '_last', '_gains', '_losses',
+                 '_gain_sum', '_loss_sum', '_gain_count', '_loss_count')
+
+    def __init__(self, period: int = RSI_PERIOD):
+        self.period = period
+        self.count = 0  # price changes seen
+        self._last = None
+        self._gains = [0.0] * period
+        self._losses = [0.0] * period
+        self._gain_sum = self._loss_sum = 0.0
+        self._gain_count = self._loss_count = 0
+
+    def update(self, close: float):
+        """Add the change from the previous close"""
+        if self._last is None:
+            self._last = close
+            return
+
+        delta = close - self._last
+        self._last = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        slot = self.count % self.period
+        old_gain, old_loss = self._gains[slot], self._losses[slot]
+        self._gains[slot], self._losses[slot] = gain, loss
+        self._gain_count += (gain > 0) - (old_gain > 0)
+        self._loss_count += (loss > 0) - (old_loss > 0)
+        self.count += 1
+
+        if slot == self.period - 1:
+            self._gain_sum, self._loss_sum = sum(self._gains), sum(self._losses)
+        else:
+            self._gain_sum += gain - old_gain
+            self._loss_sum += loss - old_loss
+
+    def value(self) -> float:
+        """Current RSI (50 until period changes have been seen)"""
+        if self.count < self.period:
+            return 50.0
+        if self._loss_count == 0:
+            return 100.0
+
+        gain_sum = self._gain_sum if self._gain_count else 0.0
+        rs = gain_sum / self._loss_sum
+        return 100 - (100 / (1 + rs))
+
 
 class FeatureEngineer:
     """
@@ -17,10 +161,10 @@ class FeatureEngineer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         # Store historical data for rolling calculations
-        self.price_history = []
-        self.oi_history = []
-        self.volume_history = []
-        self.funding_history = []
+        self.price_history = _RingBuffer(MAX_HISTORY, len(PRICE_FIELDS))
+        self.oi_history = _RingBuffer(MAX_HISTORY)
+        self.funding_history = _RingBuffer(MAX_HISTORY)
+        self.rsi = _RunningRSI(RSI_PERIOD)
 
     def compute_features(self, market_data: Dict) -> Dict:
         """
@@ -41,40 +185,41 @@ class FeatureEngineer:
             # Update history
             self._update_history(price_data, oi_data, funding_data)
 
+            # History views, taken once and shared by all feature groups (no copies)
+            prices = self.price_history.window()
+            oi = self.oi_history.window()
+            funding = self.funding_history.window()
+
             # Compute features
             features = {}
 
             # Price features
-            features.update(self._compute_price_features())
+            features.update(self._compute_price_features(prices))
 
             # OI features
-            features.update(self._compute_oi_features())
+            features.update(self._compute_oi_features(oi))
 
             # Volume features
-            features.update(self._compute_volume_features())
+            features.update(self._compute_volume_features(prices[VOLUME]))
 
             # Funding features
-            features.update(self._compute_funding_features())
+            features.update(self._compute_funding_features(funding))
 
             # Cross features
-            features.update(self._compute_cross_features())
+            features.update(self._compute_cross_features(prices[CLOSE], oi))
 
             return features
 
         except Exception as e:
-            self.logger.error(f"Error computing features: {e}", exc_info=True)
+            self.logger.error(f"Error computing features: {type(e).__name__}: {e}")
+            self.logger.debug("Error computing features", exc_info=True)
             return {}
 
     def _update_history(self, price_data: Dict, oi_data: Dict, funding_data: Dict):
         """Update historical data buffers"""
         if price_data:
-            self.price_history.append({
-                'close': price_data.get('close', 0),
-                'high': price_data.get('high', 0),
-                'low': price_data.get('low', 0),
-                'open': price_data.get('open', 0),
-                'volume': price_data.get('volume', 0)
-            })
+            self.price_history.append([price_data.get(field, 0) for field in PRICE_FIELDS])
+            self.rsi.update(float(price_data.get('close', 0)))
 
         if oi_data:
             self.oi_history.append(oi_data.get('sum_open_interest', 0))
@@ -82,27 +227,14 @@ class FeatureEngineer:
         if funding_data:
             self.funding_history.append(funding_data.get('funding_rate', 0))
 
-        # Keep last 100 periods
-        max_history = 100
-        if len(self.price_history) > max_history:
-            self.price_history = self.price_history[-max_history:]
-        if len(self.oi_history) > max_history:
-            self.oi_history = self.oi_history[-max_history:]
-        if len(self.funding_history) > max_history:
-            self.funding_history = self.funding_history[-max_history:]
-
-    def _compute_price_features(self) -> Dict:
-        """Compute price-based features"""
+    def _compute_price_features(self, prices: np.ndarray) -> Dict:
+        """Compute price-based features (prices: one row per PRICE_FIELDS entry)"""
         features = {}
 
-        if len(self.price_history) < 2:
+        if prices.shape[1] < 2:
             return features
 
-        # Convert to arrays
-        closes = np.array([p['close'] for p in self.price_history])
-        highs = np.array([p['high'] for p in self.price_history])
-        lows = np.array([p['low'] for p in self.price_history])
-        volumes = np.array([p['volume'] for p in self.price_history])
+        closes, highs, lows, _, volumes = prices
 
         # Returns
         if len(closes) >= 2:
@@ -114,47 +246,41 @@ class FeatureEngineer:
 
         # Volatility (ATR-based)
         if len(closes) >= 14:
-            tr_list = []
-            for i in range(1, len(closes)):
-                tr = max(
-                    highs[i] - lows[i],
-                    abs(highs[i] - closes[i - 1]),
-                    abs(lows[i] - closes[i - 1])
-                )
-                tr_list.append(tr)
-            atr_14 = np.mean(tr_list[-14:])
+            # True range over the last 14 bars (needs 15 closes)
+            h, l, prev_close = highs[-14:], lows[-14:], closes[-15:-1]
+            if len(prev_close) < len(h):  # only 14 bars of history yet
+                h, l = h[1:], l[1:]
+            tr = np.maximum(np.maximum(h - l, np.abs(h - prev_close)), np.abs(l - prev_close))
+            atr_14 = tr.mean()
             features['atr_14'] = atr_14
             features['natr'] = atr_14 / closes[-1] if closes[-1] != 0 else 0
 
         # RSI
         if len(closes) >= 14:
-            features['rsi_14'] = self._calculate_rsi(closes, 14)
+            features['rsi_14'] = self.rsi.value()
 
-        # Bollinger Bands
+        # Bollinger Bands and moving average share one 20-period mean/std
         if len(closes) >= 20:
-            bb_features = self._calculate_bollinger_bands(closes, 20, 2)
-            features.update(bb_features)
+            close_stats = self.price_history.mean_std(CLOSE)
+            features.update(self._calculate_bollinger_bands(closes, 20, 2, close_stats))
 
-        # Moving averages
-        if len(closes) >= 20:
-            features['sma_20'] = np.mean(closes[-20:])
+            features['sma_20'] = close_stats[0]
             features['price_to_sma20'] = closes[-1] / features['sma_20'] - 1 if features['sma_20'] != 0 else 0
 
         # Volume
         if len(volumes) >= 20:
-            features['volume_ratio'] = volumes[-1] / np.mean(volumes[-20:]) if np.mean(volumes[-20:]) != 0 else 1
+            volume_mean, _ = self.price_history.mean_std(VOLUME)
+            features['volume_ratio'] = volumes[-1] / volume_mean if volume_mean != 0 else 1
 
         return features
 
-    def _compute_oi_features(self) -> Dict:
+    def _compute_oi_features(self, oi: np.ndarray) -> Dict:
         """Compute Open Interest features"""
         features = {}
 
-        if len(self.oi_history) < 2:
+        if len(oi) < 2:
             return features
 
-        oi = np.array(self.oi_history)
-
         # OI changes
         if len(oi) >= 2:
             features['oi_change_1'] = (oi[-1] - oi[-2]) / oi[-2] if oi[-2] != 0 else 0
@@ -172,42 +298,36 @@ class FeatureEngineer:
 
         # OI Z-score
         if len(oi) >= 20:
-            oi_mean = np.mean(oi[-20:])
-            oi_std = np.std(oi[-20:])
+            oi_mean, oi_std = self.oi_history.mean_std()
             features['oi_zscore'] = (oi[-1] - oi_mean) / oi_std if oi_std != 0 else 0
 
         return features
 
-    def _compute_volume_features(self) -> Dict:
+    def _compute_volume_features(self, volumes: np.ndarray) -> Dict:
         """Compute volume features"""
         features = {}
 
-        if len(self.price_history) < 2:
+        if len(volumes) < 2:
             return features
 
-        volumes = np.array([p['volume'] for p in self.price_history])
-
         # Volume changes
         if len(volumes) >= 2:
             features['volume_change_1'] = (volumes[-1] - volumes[-2]) / volumes[-2] if volumes[-2] != 0 else 0
 
         # Volume Z-score
         if len(volumes) >= 20:
-            vol_mean = np.mean(volumes[-20:])
-            vol_std = np.std(volumes[-20:])
+            vol_mean, vol_std = self.price_history.mean_std(VOLUME)
             features['volume_zscore'] = (volumes[-1] - vol_mean) / vol_std if vol_std != 0 else 0
 
         return features
 
-    def _compute_funding_features(self) -> Dict:
+    def _compute_funding_features(self, funding: np.ndarray) -> Dict:
         """Compute funding rate features"""
         features = {}
 
-        if len(self.funding_history) < 1:
+        if len(funding) < 1:
             return features
 
-        funding = np.array(self.funding_history)
-
         # Latest funding rate
         features['funding_rate'] = funding[-1]
 
@@ -221,57 +341,38 @@ class FeatureEngineer:
 
         # Funding Z-score
         if len(funding) >= 20:
-            funding_mean = np.mean(funding[-20:])
-            funding_std = np.std(funding[-20:])
+            funding_mean, funding_std = self.funding_history.mean_std()
             features['funding_zscore'] = (funding[-1] - funding_mean) / funding_std if funding_std != 0 else 0
 
         return features
 
-    def _compute_cross_features(self) -> Dict:
+    def _compute_cross_features(self, closes: np.ndarray, oi: np.ndarray) -> Dict:
         """Compute cross-feature interactions"""
         features = {}
 
         # OI-Price divergence
-        if len(self.price_history) >= 20 and len(self.oi_history) >= 20:
-            closes = np.array([p['close'] for p in self.price_history])
-
+        if len(closes) >= 20 and len(oi) >= 20:
             price_change_20 = (closes[-1] - closes[-20]) / closes[-20] if closes[-20] != 0 else 0
-            oi_change_20 = (self.oi_history[-1] - self.oi_history[-20]) / self.oi_history[-20] \
-                if self.oi_history[-20] != 0 else 0
+            oi_change_20 = (oi[-1] - oi[-20]) / oi[-20] if oi[-20] != 0 else 0
 
             features['oi_price_divergence_20'] = oi_change_20 - price_change_20
 
         return features
 
     @staticmethod
-    def _calculate_rsi(prices: np.ndarray, period: int = 14) -> float:
-        """Calculate RSI indicator"""
-        if len(prices) < period + 1:
-            return 50.0
-
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-
-        if avg_loss == 0:
-            return 100.0
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
-
-    @staticmethod
-    def _calculate_bollinger_bands(prices: np.ndarray, period: int = 20, num_std: float = 2) -> Dict:
-        """Calculate Bollinger Bands"""
+    def _calculate_bollinger_bands(prices: np.ndarray, period: int = 20, num_std: float = 2,
+                                   mean_std: tuple = None) -> Dict:
+        """Calculate Bollinger Bands (mean_std: precomputed (sma, std) of the last period prices)"""
         if len(prices) < period:
             return {}
 
-        sma = np.mean(prices[-period:])
-        std = np.std(prices[-period:])
+        if mean_std is None:
+            # One pass for both moments: sum and sum of squares
+            window = prices[-period:]
+            sma = window.sum() / period
+            std = math.sqrt(max(window.dot(window) / period - sma * sma, 0.0))
+        else:
+            sma, std = mean_std
 
         upper_band = sma + (num_std * std)
         lower_band = sma - (num_std * std)
@@ -9,6 +9,9 @@ import logging
 from typing import Dict, List
 from database.trade_logger import TradeLogger
 
+# Longest single scheduler sleep, so a stop is noticed within this many seconds
+MAX_SCHEDULER_SLEEP = 3600
+
 
 class OnlineLearner:
     """
@@ -37,10 +40,14 @@ class OnlineLearner:
         # Schedule weekly full retraining
         schedule.every().sunday.at("03:00").do(self.weekly_retrain)
 
-        # Run scheduler
+        # Run scheduler, sleeping until the next job is due
         while True:
             schedule.run_pending()
-            time.sleep(60)
+            idle = schedule.idle_seconds()
+            if idle is None:
+                break
+            if idle > 0:
+                time.sleep(min(idle, MAX_SCHEDULER_SLEEP))
 
     def daily_update(self):
         """
@@ -86,13 +93,15 @@ class OnlineLearner:
         self.logger.info("Starting weekly full retrain...")
 
         try:
-            # Get all data from last month
-            data = self.trade_logger.get_trades_last_n_days(30)
+            # Stream the last month of data one day at a time
+            n_trades = 0
+            for trades in self.trade_logger.iter_trades_last_n_days(30, chunk_days=1):
+                n_trades += len(trades)
 
-            # Full retraining pipeline
-            # ...
+                # Full retraining pipeline
+                # ...
 
-            self.logger.info("✅ Weekly retrain completed (placeholder)")
+            self.logger.info(f"✅ Weekly retrain completed (placeholder, {n_trades} trades)")
 
         except Exception as e:
             self.logger.error(f"Error in weekly retrain: {e}", exc_info=True)
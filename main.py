@@ -4,20 +4,38 @@ Initializes and runs the autonomous trading system
 """
 
 import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import re
 import sys
 from pathlib import Path
 import yaml
 import redis
+import redis.asyncio
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml bindings
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import uvloop  # libuv event loop; not available on Windows
+except ImportError:
+    uvloop = None
+
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from bot.trading_bot import AITradingBot
 
+# ${VAR} placeholders in config values
+ENV_VAR_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
 
 def setup_logging(log_level: str = "INFO", log_file: str = "./logs/trading_bot.log"):
     """
@@ -30,14 +48,30 @@ def setup_logging(log_level: str = "INFO", log_file: str = "./logs/trading_bot.l
     # Create logs directory
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    # Configure logging
+    # Configure logging. Records are queued by the calling thread and
+    # written to file/stdout by a listener thread, so log calls in the
+    # trading loop never block on I/O.
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # The queue handler only merges args (and any traceback) into the message;
+    # the real handlers apply the full format
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
+        handlers=[queue_handler]
     )
 
     logger = logging.getLogger(__name__)
@@ -61,20 +95,24 @@ def load_config(config_path: str = "./config/config.yaml") -> dict:
 
     # Load config file
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
+
+    # Replace environment variables in config. Substitution happens on the
+    # parsed string values, so secrets are never re-parsed as YAML.
+    def substitute(match):
+        return os.environ.get(match.group(1), match.group(0))
 
-    # Replace environment variables in config
     def replace_env_vars(obj):
         """Recursively replace ${VAR} with environment variable values"""
         if isinstance(obj, dict):
-            return {k: replace_env_vars(v) for k, v in obj.items()}
+            for k, v in obj.items():
+                obj[k] = replace_env_vars(v)
         elif isinstance(obj, list):
-            return [replace_env_vars(item) for item in obj]
-        elif isinstance(obj, str) and obj.startswith('${') and obj.endswith('}'):
-            var_name = obj[2:-1]
-            return os.getenv(var_name, obj)
-        else:
-            return obj
+            for i, item in enumerate(obj):
+                obj[i] = replace_env_vars(item)
+        elif isinstance(obj, str) and '${' in obj:
+            return ENV_VAR_PATTERN.sub(substitute, obj)
+        return obj
 
     config = replace_env_vars(config)
 
@@ -94,12 +132,18 @@ def initialize_redis(config: dict):
     redis_config = config.get('redis', {})
 
     try:
-        redis_client = redis.Redis(
+        # One long-lived pool shared by the bot, streamer and executor; TCP
+        # keepalive avoids reconnecting after quiet periods
+        pool = redis.ConnectionPool(
             host=redis_config.get('host', 'localhost'),
             port=redis_config.get('port', 6379),
             db=redis_config.get('db', 0),
-            decode_responses=redis_config.get('decode_responses', True)
+            decode_responses=redis_config.get('decode_responses', True),
+            max_connections=redis_config.get('max_connections', 16),
+            socket_keepalive=True,
+            health_check_interval=30
         )
+        redis_client = redis.Redis(connection_pool=pool)
 
         # Test connection
         redis_client.ping()
@@ -116,21 +160,74 @@ def initialize_redis(config: dict):
             def __init__(self):
                 self.data = {}
 
-            def set(self, key, value):
+            def set(self, key, value, ex=None):
                 self.data[key] = value
 
             def get(self, key):
                 return self.data.get(key)
 
+            def setex(self, key, seconds, value):
+                self.data[key] = value
+
+            def hset(self, key, field, value):
+                self.data.setdefault(key, {})[field] = value
+
+            def hget(self, key, field):
+                return self.data.get(key, {}).get(field)
+
+            def hmget(self, key, fields):
+                return [self.hget(key, field) for field in fields]
+
             def expire(self, key, seconds):
                 pass
 
+            def pipeline(self, transaction=True):
+                return self
+
+            def execute(self):
+                return []
+
             def ping(self):
                 return True
 
         return RedisMock()
 
 
+async def initialize_async_redis(config: dict):
+    """
+    Initialize pooled asyncio Redis connection for reads from the trading loop
+
+    Args:
+        config: Redis configuration
+
+    Returns:
+        redis.asyncio client, or None if Redis is unreachable
+    """
+    redis_config = config.get('redis', {})
+
+    try:
+        pool = redis.asyncio.ConnectionPool(
+            host=redis_config.get('host', 'localhost'),
+            port=redis_config.get('port', 6379),
+            db=redis_config.get('db', 0),
+            decode_responses=redis_config.get('decode_responses', True),
+            max_connections=redis_config.get('max_connections', 16),
+            socket_keepalive=True,
+            health_check_interval=30
+        )
+        async_redis_client = redis.asyncio.Redis(connection_pool=pool)
+
+        # Test connection
+        await async_redis_client.ping()
+        logging.info("Async Redis connection pool established")
+
+        return async_redis_client
+
+    except Exception as e:
+        logging.warning(f"Async Redis unavailable, falling back to sync reads: {e}")
+        return None
+
+
 async def main():
     """Main async function"""
     # Load configuration
@@ -148,9 +245,10 @@ async def main():
 
     # Initialize Redis
     redis_client = initialize_redis(config)
+    async_redis_client = await initialize_async_redis(config)
 
     # Initialize trading bot
-    bot = AITradingBot(config=config, redis_client=redis_client)
+    bot = AITradingBot(config=config, redis_client=redis_client, async_redis_client=async_redis_client)
 
     # Start bot
     try:
@@ -167,5 +265,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
+
     # Run async main
     asyncio.run(main())
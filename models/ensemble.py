@@ -4,7 +4,9 @@ Combines XGBoost, LSTM, and other models for robust predictions
 """
 
 import numpy as np
+import hashlib
 import pickle
+from itertools import repeat
 import logging
 from typing import Dict, Tuple
 import os
@@ -23,6 +25,19 @@ class EnsembleModel:
         self.meta_model = None
         self.feature_names = []
 
+        # Digest of the loaded model file, mixed into feature_key() so cached
+        # predictions of a previous model are never served after a reload
+        self.model_id = b''
+
+        # Model input buffer, reused by every _prepare_features call
+        self._feature_order = ()
+        self._feature_buf = None
+
+        # Dummy predictions draw from one generator instead of the global
+        # RandomState, which takes a lock on every call
+        self._rng = np.random.default_rng()
+        self._bind_models()
+
     @classmethod
     def load(cls, model_path: str) -> 'EnsembleModel':
         """
@@ -40,13 +55,20 @@ class EnsembleModel:
         try:
             if os.path.exists(model_path):
                 with open(model_path, 'rb') as f:
+                    digest = hashlib.blake2b(digest_size=16)
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+                    f.seek(0)
                     model_data = pickle.load(f)
+                instance.model_id = digest.digest()
 
                 instance.xgb_classifier = model_data.get('xgb_classifier')
                 instance.xgb_regressor = model_data.get('xgb_regressor')
                 instance.lstm_model = model_data.get('lstm_model')
                 instance.meta_model = model_data.get('meta_model')
+                instance._bind_models()
                 instance.feature_names = model_data.get('feature_names', [])
+                instance._bind_feature_names()
 
                 instance.logger.info("Ensemble model loaded successfully")
             else:
@@ -64,6 +86,42 @@ class EnsembleModel:
         self.logger.warning("Initializing dummy model for testing")
         # Dummy model will return random predictions
         self.feature_names = ['dummy_feature']
+        self._bind_feature_names()
+
+    def _bind_models(self):
+        """Resolve the signal and target predictors for the loaded models once"""
+        if self.xgb_classifier is not None:
+            self._predict_signal = self._predict_signal_model
+        else:
+            self._predict_signal = self._predict_signal_dummy
+
+        if self.xgb_regressor is not None:
+            self._predict_target = self._predict_target_model
+        else:
+            self._predict_target = self._predict_target_dummy
+
+    def _predict_signal_model(self, feature_vector: np.ndarray) -> Tuple[int, float]:
+        """Classification: Long/Short/Neutral"""
+        signal_proba = self.xgb_classifier.predict_proba(feature_vector)[0]
+        signal = int(np.argmax(signal_proba))
+        return signal, float(signal_proba[signal])
+
+    def _predict_signal_dummy(self, feature_vector: np.ndarray) -> Tuple[int, float]:
+        """Random signal used when no classifier is loaded"""
+        return int(self._rng.integers(0, 3)), float(self._rng.uniform(0.4, 0.7))
+
+    def _predict_target_model(self, feature_vector: np.ndarray) -> float:
+        """Regression: Price target"""
+        return float(self.xgb_regressor.predict(feature_vector)[0])
+
+    def _predict_target_dummy(self, feature_vector: np.ndarray) -> float:
+        """Random target used when no regressor is loaded"""
+        return float(self._rng.uniform(-0.01, 0.01))
+
+    def _bind_feature_names(self):
+        """Freeze the feature order and allocate the input buffer for it"""
+        self._feature_order = tuple(self.feature_names)
+        self._feature_buf = np.zeros((1, len(self._feature_order)), dtype=np.float32)
 
     def predict(self, features: Dict) -> Dict:
         """
@@ -79,47 +137,57 @@ class EnsembleModel:
                 - target: Expected price movement %
         """
         try:
-            # Prepare feature vector
             feature_vector = self._prepare_features(features)
+        except Exception as e:
+            self.logger.error(f"Error preparing features: {e}", exc_info=True)
+            return self._neutral_prediction()
 
-            # Get predictions from each model
-            if self.xgb_classifier is not None:
-                # Classification: Long/Short/Neutral
-                signal_proba = self.xgb_classifier.predict_proba(feature_vector)[0]
-                signal = np.argmax(signal_proba)
-                confidence = signal_proba[signal]
-            else:
-                # Dummy prediction
-                signal = np.random.choice([0, 1, 2])
-                confidence = np.random.uniform(0.4, 0.7)
+        return self.predict_from_vector(feature_vector, features.get('timestamp', ''))
 
-            if self.xgb_regressor is not None:
-                # Regression: Price target
-                target = self.xgb_regressor.predict(feature_vector)[0]
-            else:
-                # Dummy target
-                target = np.random.uniform(-0.01, 0.01)
+    def predict_from_vector(self, feature_vector: np.ndarray, timestamp='') -> Dict:
+        """
+        Make prediction from an already prepared feature vector
+
+        Lets callers that score the same features with several models build
+        the vector once with _prepare_features and reuse it.
+
+        Args:
+            feature_vector: (1, n_features) float32 array from _prepare_features
+            timestamp: Timestamp to attach to the prediction
+
+        Returns:
+            Prediction dictionary, same shape as predict()
+        """
+        try:
+            # Get predictions from each model
+            signal, confidence = self._predict_signal(feature_vector)
+            target = self._predict_target(feature_vector)
 
             result = {
-                'signal': int(signal),
-                'confidence': float(confidence),
-                'target': float(target),
-                'timestamp': features.get('timestamp', '')
+                'signal': signal,
+                'confidence': confidence,
+                'target': target,
+                'timestamp': timestamp
             }
 
-            self.logger.debug(f"Prediction: signal={signal}, confidence={confidence:.2%}, target={target:.2%}")
+            self.logger.debug("Prediction: signal=%d, confidence=%.2f%%, target=%.2f%%",
+                              signal, confidence * 100, target * 100)
 
             return result
 
         except Exception as e:
             self.logger.error(f"Error making prediction: {e}", exc_info=True)
-            # Return neutral signal on error
-            return {
-                'signal': 1,
-                'confidence': 0.5,
-                'target': 0.0,
-                'timestamp': ''
-            }
+            return self._neutral_prediction()
+
+    @staticmethod
+    def _neutral_prediction() -> Dict:
+        """Neutral signal returned when prediction fails"""
+        return {
+            'signal': 1,
+            'confidence': 0.5,
+            'target': 0.0,
+            'timestamp': ''
+        }
 
     def _prepare_features(self, features: Dict) -> np.ndarray:
         """
@@ -129,8 +197,19 @@ class EnsembleModel:
             features: Dictionary of features
 
         Returns:
-            Numpy array of features in correct order
+            float32 numpy array of features in correct order (XGBoost works
+            in float32 internally, so this avoids a conversion copy per call).
+            With known feature names this is a shared buffer overwritten by
+            the next call; the models copy it into their own input structures.
         """
+        if self._feature_buf is None and self.feature_names:
+            self._bind_feature_names()
+
+        if self._feature_order:
+            # map() runs the dict lookups in C, with no per-name bytecode
+            self._feature_buf[0] = list(map(features.get, self._feature_order, repeat(0.0)))
+            return self._feature_buf
+
         if not self.feature_names:
             # If no feature names, use all numeric features
             feature_values = [v for v in features.values() if isinstance(v, (int, float))]
@@ -142,7 +221,32 @@ class EnsembleModel:
         if not feature_values:
             feature_values = [0.0] * 10  # Dummy values
 
-        return np.array(feature_values).reshape(1, -1)
+        return np.array(feature_values, dtype=np.float32).reshape(1, -1)
+
+    def feature_key(self, features: Dict, decimals: int = 3) -> bytes:
+        """
+        Digest of the model input with values rounded to the given decimals
+
+        Two feature dicts that map to the same key give the same prediction
+        from the same loaded model file, so the key can be used to cache
+        predict() results while has_model is True.
+
+        Args:
+            features: Dictionary of features
+            decimals: Decimal places kept before hashing
+
+        Returns:
+            16-byte blake2b digest
+        """
+        vector = self._prepare_features(features)
+        quantized = np.round(vector * 10 ** decimals).astype(np.int64)
+        return hashlib.blake2b(quantized.tobytes(), digest_size=16,
+                               key=self.model_id).digest()
+
+    @property
+    def has_model(self) -> bool:
+        """True when both predictors are trained models rather than random dummies"""
+        return self.xgb_classifier is not None and self.xgb_regressor is not None
 
     def save(self, model_path: str):
         """
@@ -162,8 +266,14 @@ class EnsembleModel:
 
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
 
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
+            # Write to a temp file and swap it in whole, so a concurrent load
+            # never sees a partially written model
+            tmp_path = model_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(model_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, model_path)
 
             self.logger.info(f"Model saved to {model_path}")
 
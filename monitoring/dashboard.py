@@ -3,15 +3,80 @@ Streamlit Dashboard for Trading Bot Monitoring
 Real-time dashboard showing equity, trades, and performance metrics
 """
 
+import os
+import time
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import time
 from datetime import datetime
+from dateutil import tz
+from typing import Tuple
 from database.trade_logger import TradeLogger
 import yaml
 
+REFRESH_INTERVAL = 5  # seconds between fragment reruns
+MAX_CHART_POINTS = 2000  # equity points sent to the browser per redraw
+EQUITY_HISTORY_DAYS = 7  # equity history window shown on the chart
+
+
+def _minmax_downsample(x: np.ndarray, y: np.ndarray, max_points: int = MAX_CHART_POINTS):
+    """
+    Downsample a line to at most ~max_points while keeping its visual shape
+
+    The series is cut into equal-width buckets and the minimum and maximum
+    of each bucket are kept (in time order), so peaks and drawdowns survive.
+
+    Args:
+        x: Point x values
+        y: Point y values
+
+    Returns:
+        (x, y) subsets
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+
+    width = -(-n // (max_points // 2))
+    n_buckets = -(-n // width)  # last bucket may be partial, never empty
+
+    buckets = np.full(n_buckets * width, np.nan)
+    buckets[:n] = y
+    buckets = buckets.reshape(n_buckets, width)
+    starts = np.arange(n_buckets) * width
+
+    keep = np.concatenate([
+        starts + np.nanargmin(buckets, axis=1),
+        starts + np.nanargmax(buckets, axis=1),
+        [0, n - 1]
+    ])
+    keep = np.unique(keep)  # sorted, drops buckets where min and max coincide
+    return x[keep], y[keep]
+
+
+def _to_local_times(ts_ns: np.ndarray) -> np.ndarray:
+    """Epoch ns -> naive local datetime64, matching the ISO timestamps in the log"""
+    return pd.to_datetime(ts_ns, unit='ns', utc=True).tz_convert(tz.tzlocal()).tz_localize(None).to_numpy()
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    """(mtime ns, size) of a file, changing whenever it is written; (0, 0) if missing"""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return 0, 0
+
+
+# The log file stamp is part of the cache key, so a refresh with no new
+# log writes is answered from the cache without touching the log.
+# Arguments prefixed with _ are excluded from the key.
+@st.cache_data(show_spinner=False, max_entries=4)
+def _cached_recent_trades(_trade_logger: TradeLogger, log_file: str, log_stamp: Tuple[int, int], limit: int):
+    return _trade_logger.get_recent_trades(limit=limit)
+
 
 class TradingDashboard:
     """
@@ -34,20 +99,39 @@ class TradingDashboard:
 
         st.title("🤖 AI Trading Bot - Live Dashboard")
 
-        # Auto-refresh
-        placeholder = st.empty()
-
-        while True:
-            with placeholder.container():
-                self._render_dashboard()
-
-            time.sleep(5)  # Refresh every 5 seconds
+        self._render_dashboard()
 
     def _render_dashboard(self):
         """
         Render all dashboard components
+
+        Each section is a fragment that refreshes itself every
+        REFRESH_INTERVAL seconds, so a refresh reruns only that section
+        instead of the whole script.
         """
         # Top metrics
+        self._metrics_fragment()
+
+        st.divider()
+
+        # Charts
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader("📈 Equity Curve")
+            self._equity_fragment()
+
+        with col2:
+            st.subheader("📊 Recent Trades")
+            self._trades_fragment()
+
+        # Risk metrics
+        st.subheader("⚠️ Risk Metrics")
+        self._render_risk_metrics()
+
+    @st.fragment(run_every=REFRESH_INTERVAL)
+    def _metrics_fragment(self):
+        """Top-row account metrics"""
         col1, col2, col3, col4, col5 = st.columns(5)
 
         # Mock data for now
@@ -66,40 +150,79 @@ class TradingDashboard:
         with col5:
             st.metric("Max Drawdown", "5.2%", "Live")
 
-        st.divider()
+    @st.fragment(run_every=REFRESH_INTERVAL)
+    def _equity_fragment(self):
+        """Equity curve chart"""
+        equity_chart = self._plot_equity_curve()
+        st.plotly_chart(equity_chart, use_container_width=True)
 
-        # Charts
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.subheader("📈 Equity Curve")
-            equity_chart = self._plot_equity_curve()
-            st.plotly_chart(equity_chart, use_container_width=True)
-
-        with col2:
-            st.subheader("📊 Recent Trades")
-            trades_df = self._get_recent_trades()
-            st.dataframe(trades_df, use_container_width=True)
-
-        # Risk metrics
-        st.subheader("⚠️ Risk Metrics")
-        self._render_risk_metrics()
+    @st.fragment(run_every=REFRESH_INTERVAL)
+    def _trades_fragment(self):
+        """Recent trades table"""
+        trades_df = self._get_recent_trades()
+        st.dataframe(trades_df, use_container_width=True)
 
     def _plot_equity_curve(self):
-        """Plot equity curve"""
-        df = self.trade_logger.get_equity_history()
+        """
+        Plot equity curve
 
-        if len(df) == 0:
-            # Create dummy data
-            df = pd.DataFrame({
-                'timestamp': pd.date_range(start='2024-01-01', periods=10, freq='H'),
-                'equity': [2000 + i * 5 for i in range(10)]
-            })
+        The figure and the points behind it live in the session state; each
+        refresh fetches only the snapshots logged since the last one and
+        updates the existing trace instead of building a new figure. Points
+        older than EQUITY_HISTORY_DAYS are dropped as new ones arrive.
+        """
+        state = st.session_state
+        if 'equity_fig' not in state:
+            state.equity_fig = self._new_equity_figure()
+            state.equity_ts = np.empty(0, dtype=np.int64)
+            state.equity_times = np.empty(0, dtype='datetime64[ns]')
+            state.equity_values = np.empty(0)
+            state.equity_log_stamp = None
+
+        fig = state.equity_fig
+
+        # Nothing appended to the log since the last refresh: reuse the figure
+        stamp = _file_stamp(self.trade_logger.log_file)
+        if stamp == state.equity_log_stamp:
+            return fig
+        state.equity_log_stamp = stamp
+
+        if len(state.equity_ts):
+            since_ns = int(state.equity_ts[-1])
+        else:
+            since_ns = time.time_ns() - EQUITY_HISTORY_DAYS * 86_400 * 1_000_000_000
+
+        ts_ns, equity = self.trade_logger.get_equity_since(since_ns)
+        if len(ts_ns) == 0:
+            return fig
+
+        state.equity_ts = np.concatenate([state.equity_ts, ts_ns])
+        state.equity_times = np.concatenate([state.equity_times, _to_local_times(ts_ns)])
+        state.equity_values = np.concatenate([state.equity_values, equity])
+
+        # Drop points that have aged out of the history window
+        cutoff_ns = time.time_ns() - EQUITY_HISTORY_DAYS * 86_400 * 1_000_000_000
+        start = np.searchsorted(state.equity_ts, cutoff_ns)
+        if start:
+            state.equity_ts = state.equity_ts[start:]
+            state.equity_times = state.equity_times[start:]
+            state.equity_values = state.equity_values[start:]
+
+        x, y = _minmax_downsample(state.equity_times, state.equity_values)
+        with fig.batch_update():
+            fig.data[0].x = x
+            fig.data[0].y = y
+
+        return fig
 
+    @staticmethod
+    def _new_equity_figure() -> go.Figure:
+        """Equity figure holding dummy data until the first snapshot arrives"""
+        # WebGL trace: drawn on the GPU instead of as SVG paths
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['timestamp'],
-            y=df['equity'],
+        fig.add_trace(go.Scattergl(
+            x=pd.date_range(start='2024-01-01', periods=10, freq='H'),
+            y=[2000 + i * 5 for i in range(10)],
             mode='lines',
             name='Equity',
             line=dict(color='#00D9FF', width=2)
@@ -116,7 +239,8 @@ class TradingDashboard:
 
     def _get_recent_trades(self) -> pd.DataFrame:
         """Get recent trades"""
-        trades = self.trade_logger.get_recent_trades(limit=10)
+        log_file = self.trade_logger.log_file
+        trades = _cached_recent_trades(self.trade_logger, log_file, _file_stamp(log_file), 10)
 
         if len(trades) == 0:
             # Return empty dataframe with columns
@@ -126,14 +250,15 @@ class TradingDashboard:
 
         # Format for display
         if 'pnl' in trades_df.columns:
-            trades_df['pnl_formatted'] = trades_df['pnl'].apply(
-                lambda x: f"${x:.2f}" if x > 0 else f"-${abs(x):.2f}"
-            )
+            pnl = trades_df['pnl'].to_numpy(dtype=float)
+            sign = np.where(pnl > 0, '$', '-$')
+            trades_df['pnl_formatted'] = np.char.add(sign, np.char.mod('%.2f', np.abs(pnl)))
 
             return trades_df[['timestamp', 'direction', 'entry_price', 'exit_price', 'pnl_formatted', 'duration']]
 
         return trades_df
 
+    @st.fragment(run_every=REFRESH_INTERVAL)
     def _render_risk_metrics(self):
         """Render risk metrics"""
         col1, col2, col3, col4 = st.columns(4)
@@ -4,9 +4,22 @@ Sends real-time alerts and notifications
 """
 
 import logging
-from typing import Dict
+from typing import Dict, List
 import asyncio
 
+MAX_QUEUED_MESSAGES = 100  # further messages are dropped until the queue drains
+COALESCE_WINDOW = 0.25  # seconds to gather a burst of messages into one send
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit per message
+MESSAGE_SEPARATOR = "\n---\n"
+
+# Messages are sent with parse_mode='HTML'; only these characters need escaping
+HTML_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+
+def _escape(text) -> str:
+    """Escape plain text for Telegram's HTML parse mode"""
+    return str(text).translate(HTML_ESCAPES)
+
 
 class TelegramNotifier:
     """
@@ -24,6 +37,12 @@ class TelegramNotifier:
         self.logger = logging.getLogger(__name__)
         self.enabled = config.get('enabled', False)
 
+        # Messages are queued and sent by one background task, so callers in
+        # the trading loop never wait on the Telegram API
+        self._queue = asyncio.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self._sender = None
+        self.dropped_messages = 0
+
         if self.enabled:
             try:
                 from telegram import Bot
@@ -40,26 +59,87 @@ class TelegramNotifier:
 
     async def send_message(self, message: str):
         """
-        Send message to Telegram
+        Queue message for sending to Telegram
+
+        Returns immediately; messages queued within COALESCE_WINDOW of each
+        other are sent together as one Telegram message.
 
         Args:
-            message: Message text
+            message: Plain message text
         """
+        await self._enqueue(_escape(message))
+
+    async def _enqueue(self, text: str):
+        """Queue already HTML-formatted text for the sender task"""
         if not self.enabled or not self.bot:
-            self.logger.debug(f"Telegram message (not sent): {message}")
+            self.logger.debug(f"Telegram message (not sent): {text}")
             return
 
+        if self._sender is None:
+            self._sender = asyncio.create_task(self._send_queued())
+
+        try:
+            self._queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.dropped_messages += 1
+            self.logger.warning(f"Telegram queue full, dropped message ({self.dropped_messages} total)")
+
+    async def _send_queued(self):
+        """Send queued messages, coalescing bursts"""
+        while True:
+            messages = [await self._queue.get()]
+            await asyncio.sleep(COALESCE_WINDOW)
+            while not self._queue.empty():
+                messages.append(self._queue.get_nowait())
+
+            for text in self._coalesce(messages):
+                await self._deliver(text)
+
+            for _ in messages:
+                self._queue.task_done()
+
+    @staticmethod
+    def _coalesce(messages: List[str]) -> List[str]:
+        """Join messages into as few texts as fit within MAX_MESSAGE_LENGTH"""
+        texts = [messages[0]]
+        for message in messages[1:]:
+            if len(texts[-1]) + len(MESSAGE_SEPARATOR) + len(message) <= MAX_MESSAGE_LENGTH:
+                texts[-1] += MESSAGE_SEPARATOR + message
+            else:
+                texts.append(message)
+        return texts
+
+    async def _deliver(self, text: str):
+        """Send one message to Telegram"""
         try:
             await self.bot.send_message(
                 chat_id=self.chat_id,
-                text=message,
-                parse_mode='Markdown'
+                text=text,
+                parse_mode='HTML'
             )
             self.logger.debug("Telegram message sent successfully")
 
         except Exception as e:
             self.logger.error(f"Error sending Telegram message: {e}")
 
+    async def close(self, timeout: float = 10.0):
+        """
+        Send any queued messages, then stop the sender task
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        if self._sender is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Telegram queue not drained within {timeout}s, {self._queue.qsize()} messages unsent")
+
+        self._sender.cancel()
+        self._sender = None
+
     async def send_trade_alert(self, message: str):
         """
         Send trade alert
@@ -67,7 +147,7 @@ class TelegramNotifier:
         Args:
             message: Trade alert message
         """
-        await self.send_message(f"*TRADE ALERT*\n\n{message}")
+        await self._enqueue(f"<b>TRADE ALERT</b>\n\n{_escape(message)}")
 
     async def send_error(self, error_message: str):
         """
@@ -76,7 +156,7 @@ class TelegramNotifier:
         Args:
             error_message: Error description
         """
-        await self.send_message(f"*ERROR*\n\n{error_message}")
+        await self._enqueue(f"<b>ERROR</b>\n\n{_escape(error_message)}")
 
     async def send_daily_summary(self, summary: Dict):
         """
@@ -86,11 +166,11 @@ class TelegramNotifier:
             summary: Summary statistics dictionary
         """
         message = (
-            f"*Daily Summary*\n\n"
+            f"<b>Daily Summary</b>\n\n"
             f"PnL: ${summary.get('pnl', 0):.2f} ({summary.get('pnl_pct', 0):.2f}%)\n"
             f"Trades: {summary.get('total_trades', 0)}\n"
             f"Win Rate: {summary.get('win_rate', 0):.1f}%\n"
             f"Sharpe: {summary.get('sharpe', 0):.2f}\n"
             f"Max DD: {summary.get('max_dd', 0):.2f}%"
         )
-        await self.send_message(message)
+        await self._enqueue(message)
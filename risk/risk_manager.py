@@ -3,10 +3,23 @@ Risk Management Layer
 Implements safety controls and position sizing
 """
 
+import math
+import time
 import numpy as np
 import logging
+from collections import deque
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+
+RECENT_RETURNS_WINDOW = 50  # trades used for the rolling Sharpe ratio
+SHARPE_ANNUALIZATION = math.sqrt(100)  # assuming ~100 trades per year
+TRADE_HISTORY_LIMIT = 10_000  # trade records kept in memory
+MIN_POSITION_VALUE = 10.0  # smallest position notional accepted, in $
+
+
+def _next_midnight(day: date) -> float:
+    """Epoch seconds of the local midnight that ends day"""
+    return datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
 
 
 class RiskManager:
@@ -42,10 +55,17 @@ class RiskManager:
         self.consecutive_losses = 0
         self.trades_today = 0
         self.last_reset_date = datetime.now().date()
+        self._next_reset_ts = _next_midnight(self.last_reset_date)
 
         # Performance tracking
-        self.recent_returns = []
-        self.trade_history = []
+        # Last RECENT_RETURNS_WINDOW trade returns, with running sums for the
+        # Sharpe ratio (re-summed exactly once per window to shed rounding drift)
+        self.recent_returns = deque(maxlen=RECENT_RETURNS_WINDOW)
+        self._returns_count = 0
+        self._returns_sum = 0.0
+        self._returns_sumsq = 0.0
+        self._sharpe = 0.0  # recomputed on each recorded trade
+        self.trade_history = deque(maxlen=TRADE_HISTORY_LIMIT)
 
     def can_trade(self) -> bool:
         """
@@ -104,12 +124,35 @@ class RiskManager:
             return False
 
         # Check minimum position size
-        if position_value < 10:  # Minimum $10
+        if position_value < MIN_POSITION_VALUE:
             self.logger.warning(f"Position size too small: ${position_value:.2f}")
             return False
 
         return True
 
+    def validate_positions(self, position_sizes: np.ndarray, prices: np.ndarray, leverage: int) -> np.ndarray:
+        """
+        Validate many candidate positions against the same risk limits at once
+
+        Vectorized form of validate_position for callers scanning candidate
+        sizes; no per-candidate warnings are logged.
+
+        Args:
+            position_sizes: Proposed position sizes (in contracts)
+            prices: Entry prices (broadcast against position_sizes)
+            leverage: Leverage multiplier
+
+        Returns:
+            Boolean array, True where the position is valid
+        """
+        position_values = np.multiply(position_sizes, prices)
+
+        if not self.current_equity:
+            return np.zeros(position_values.shape, dtype=bool)
+
+        max_position_value = self.current_equity * self.max_position_size * leverage
+        return (position_values <= max_position_value) & (position_values >= MIN_POSITION_VALUE)
+
     def calculate_position_size(
         self,
         equity: float,
@@ -203,37 +246,60 @@ class RiskManager:
         # Track recent returns for Sharpe calculation
         if self.current_equity and self.current_equity > 0:
             trade_return = pnl / self.current_equity
+            if len(self.recent_returns) == RECENT_RETURNS_WINDOW:
+                evicted = self.recent_returns[0]
+                self._returns_sum -= evicted
+                self._returns_sumsq -= evicted * evicted
             self.recent_returns.append(trade_return)
+            self._returns_count += 1
 
-            # Keep last 50 returns
-            if len(self.recent_returns) > 50:
-                self.recent_returns = self.recent_returns[-50:]
+            if self._returns_count % RECENT_RETURNS_WINDOW == 0:
+                self._returns_sum = math.fsum(self.recent_returns)
+                self._returns_sumsq = math.fsum(r * r for r in self.recent_returns)
+            else:
+                self._returns_sum += trade_return
+                self._returns_sumsq += trade_return * trade_return
 
-    def get_recent_sharpe(self) -> float:
-        """
-        Calculate Sharpe ratio from recent trades
+            self._sharpe = self._calculate_sharpe()
 
-        Returns:
-            Sharpe ratio
-        """
-        if len(self.recent_returns) < 5:
+    def _calculate_sharpe(self) -> float:
+        """Sharpe ratio of the recent returns, from the running sums"""
+        n = len(self.recent_returns)
+        if n < 5:
             return 0.0
 
-        returns = np.array(self.recent_returns)
-        mean_return = np.mean(returns)
-        std_return = np.std(returns)
+        mean_return = self._returns_sum / n
+        mean_sq = mean_return * mean_return
+        variance = self._returns_sumsq / n - mean_sq
 
-        if std_return == 0:
+        # Identical returns leave only rounding error in the variance
+        if variance <= 1e-12 * mean_sq:
             return 0.0
 
-        # Annualized Sharpe (assuming ~100 trades per year)
-        sharpe = (mean_return / std_return) * np.sqrt(100)
+        # Annualized Sharpe
+        return mean_return / math.sqrt(variance) * SHARPE_ANNUALIZATION
+
+    def get_recent_sharpe(self) -> float:
+        """
+        Get Sharpe ratio from recent trades
 
-        return sharpe
+        Only changes when a trade is recorded, so the value is cached there
+        and this is safe to call on every loop iteration.
+
+        Returns:
+            Sharpe ratio
+        """
+        return self._sharpe
 
     def _check_daily_reset(self):
         """Reset daily counters if new day"""
+        # Before the next midnight this is one float compare; the date is
+        # only derived again once the day has rolled over
+        if time.time() < self._next_reset_ts:
+            return
+
         current_date = datetime.now().date()
+        self._next_reset_ts = _next_midnight(current_date)
 
         if current_date > self.last_reset_date:
             self.logger.info(f"Resetting daily counters for new day: {current_date}")
@@ -6,10 +6,15 @@ Uses PPO (Proximal Policy Optimization) for action selection
 import numpy as np
 import logging
 import os
+from collections import OrderedDict
 from typing import Dict, Optional
+import torch
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import BaseCallback
 
+POLICY_CACHE_SIZE = 4096  # deterministic actions memoized per agent
+STATE_QUANTIZATION = 100  # states equal to 1/100 share a cached action
+
 
 class RLAgent:
     """
@@ -21,13 +26,19 @@ class RLAgent:
         self.model = None
         self.action_space = 6  # HOLD, ENTER_LONG, ENTER_SHORT, EXIT, SCALE_IN, SCALE_OUT
 
+        # LRU of quantized state -> deterministic action. Consecutive bars
+        # often produce the same state, which then skips the policy forward pass.
+        self._policy_cache = OrderedDict()
+
     @classmethod
-    def load(cls, model_path: str) -> 'RLAgent':
+    def load(cls, model_path: str, quantize: bool = False) -> 'RLAgent':
         """
         Load trained RL agent from disk
 
         Args:
             model_path: Path to saved model file
+            quantize: Dynamically quantize the policy's Linear layers to int8
+                for faster CPU inference
 
         Returns:
             Loaded RLAgent instance
@@ -38,6 +49,9 @@ class RLAgent:
         try:
             if os.path.exists(model_path):
                 instance.model = PPO.load(model_path)
+                instance.model.policy.set_training_mode(False)  # inference only
+                if quantize:
+                    instance._quantize_policy()
                 instance.logger.info("RL agent loaded successfully")
             else:
                 instance.logger.warning(f"Model file not found: {model_path}. Using dummy agent.")
@@ -49,6 +63,17 @@ class RLAgent:
 
         return instance
 
+    def _quantize_policy(self):
+        """Swap the policy's Linear layers for int8 dynamically quantized ones"""
+        try:
+            self.model.policy = torch.ao.quantization.quantize_dynamic(
+                self.model.policy.cpu(), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.logger.info("RL policy quantized to int8")
+
+        except Exception as e:
+            self.logger.warning(f"Could not quantize RL policy, keeping float32: {e}")
+
     def _init_dummy_agent(self):
         """Initialize a dummy agent for testing when real model is not available"""
         self.logger.warning("Initializing dummy RL agent for testing")
@@ -67,20 +92,78 @@ class RLAgent:
             Action index (0-5)
         """
         try:
-            if self.model is not None:
-                action, _ = self.model.predict(state, deterministic=deterministic)
-                action = int(action)
+            if self.model is not None and deterministic:
+                action = self._cached_policy_action(state)
+            elif self.model is not None:
+                action = int(self._policy_actions(state, deterministic=False)[0])
             else:
                 # Dummy agent - mostly HOLD, occasionally trade
                 action = self._dummy_policy(state)
 
-            self.logger.debug(f"RL Agent action: {action} ({self._action_name(action)})")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("RL Agent action: %d (%s)", action, self._action_name(action))
             return action
 
         except Exception as e:
             self.logger.error(f"Error predicting action: {e}", exc_info=True)
             return 0  # Default to HOLD on error
 
+    def predict_batch(self, states: np.ndarray, deterministic: bool = True) -> np.ndarray:
+        """
+        Predict actions for a batch of states in one policy call
+
+        Args:
+            states: State vectors, shape (batch, state_size)
+            deterministic: Whether to use deterministic policy
+
+        Returns:
+            Action indices, shape (batch,); HOLD for every state on error
+        """
+        states = np.asarray(states)
+
+        try:
+            if self.model is not None:
+                return self._policy_actions(states, deterministic)
+
+            return self._dummy_policy_batch(states)
+
+        except Exception as e:
+            self.logger.error(f"Error predicting batch actions: {e}", exc_info=True)
+            return np.zeros(len(states), dtype=np.int64)  # Default to HOLD on error
+
+    def _policy_actions(self, states: np.ndarray, deterministic: bool) -> np.ndarray:
+        """
+        Run the policy network directly on one state or a batch of states
+
+        Skips PPO.predict's per-call observation-space checks and
+        numpy/tensor round-trips; the agent's Box observations and Discrete
+        actions need none of its reshaping or clipping.
+        """
+        policy = self.model.policy
+        obs = torch.as_tensor(np.asarray(states, dtype=np.float32), device=policy.device)
+
+        with torch.inference_mode():
+            actions = policy._predict(obs.reshape(-1, obs.shape[-1]), deterministic=deterministic)
+
+        return actions.cpu().numpy().astype(np.int64, copy=False).reshape(-1)
+
+    def _cached_policy_action(self, state: np.ndarray) -> int:
+        """Deterministic policy action, memoized on the quantized state"""
+        key = np.rint(np.asarray(state) * STATE_QUANTIZATION).astype(np.int32).tobytes()
+
+        action = self._policy_cache.get(key)
+        if action is not None:
+            self._policy_cache.move_to_end(key)
+            return action
+
+        action = int(self._policy_actions(state, deterministic=True)[0])
+
+        self._policy_cache[key] = action
+        if len(self._policy_cache) > POLICY_CACHE_SIZE:
+            self._policy_cache.popitem(last=False)
+
+        return action
+
     def _dummy_policy(self, state: np.ndarray) -> int:
         """
         Dummy policy for testing
@@ -108,6 +191,24 @@ class RLAgent:
 
         return 0  # HOLD
 
+    def _dummy_policy_batch(self, states: np.ndarray) -> np.ndarray:
+        """Vectorized _dummy_policy over rows of states"""
+        actions = np.zeros(len(states), dtype=np.int64)  # HOLD
+        if states.ndim != 2 or states.shape[1] < 4:
+            return actions
+
+        position = states[:, 0]
+        ml_signal = states[:, 3]
+        ml_confidence = states[:, 4] if states.shape[1] > 4 else np.zeros(len(states))
+
+        flat = position == 0
+        confident = flat & (ml_confidence > 0.65)
+        actions[confident & (ml_signal > 0.5)] = 1  # ENTER_LONG
+        actions[confident & (ml_signal < -0.5)] = 2  # ENTER_SHORT
+        actions[~flat & (ml_confidence < 0.5)] = 3  # EXIT_POSITION
+
+        return actions
+
     def _action_name(self, action: int) -> str:
         """Get action name from index"""
         action_names = ['HOLD', 'ENTER_LONG', 'ENTER_SHORT', 'EXIT', 'SCALE_IN', 'SCALE_OUT']
@@ -144,6 +245,9 @@ class RLAgent:
                 # Simplified for now
                 self.logger.info(f"Updating RL agent with {len(new_experiences)} new experiences")
                 # Implementation would go here
+
+                # Cached actions belong to the previous policy weights
+                self._policy_cache.clear()
             else:
                 self.logger.debug("Skipping RL update (dummy agent or no experiences)")
 